@@ -0,0 +1,265 @@
+"""Precomputed rollups for the Results page.
+
+Build them offline with ``python aggregates.py``; the page then only reads the
+small artifact written to ``data/aggregates/`` instead of the raw transactions.
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+
+from data_loader import cc_rfm_path, data_dir, file_signature, load_rfm
+from demographics import compute_demographics, load_demographics
+from partitions import (combined_rollups, is_partitioned, load_transaction_files, partition_accounts,
+                        partition_signatures, transaction_paths)
+from profiling import section
+from segmentation import name_segments
+from shared_cache import shared
+from timeseries import time_series
+
+# bump whenever the contents of the artifact change so stale files are never read
+AGGREGATES_VERSION = 5
+
+aggregates_dir = os.path.join(data_dir, "aggregates")
+manifest_path = os.path.join(aggregates_dir, "manifest.json")
+
+CLUSTER_METRICS = ["recency", "frequency", "total_amt", "avg_spend", "tenure", "clv", "city_pop"]
+
+TRANSACTION_COLUMNS = ["acct_num", "dob", "trans_datetime", "trans_num", "amt", "category_group"]
+
+# one build at a time per process, sessions opening the Results page together would all rebuild
+_build_lock = threading.RLock()
+
+
+def source_paths():
+    # transaction file(s) first, the RFM table last
+    return transaction_paths() + [cc_rfm_path]
+
+
+def source_fingerprint(paths=None):
+    # cheap key used to look an artifact up without hashing the sources on every page view
+    paths = paths or source_paths()
+    return json.dumps({os.path.abspath(p): list(file_signature(p)) for p in paths}, sort_keys=True)
+
+
+def source_hash(paths=None, chunk_size=1 << 20):
+    """Key of the artifact built from paths.
+
+    cc_clean.csv and cc_rfm.csv are hashed by content. Monthly partitions are keyed
+    on the signatures in the partitions manifest instead, so adding a month does
+    not read every earlier month again.
+    """
+    paths = paths or source_paths()
+    transactions, rfm_path = paths[:-1], paths[-1]
+    digest = hashlib.sha256(str(AGGREGATES_VERSION).encode())
+    if is_partitioned(transactions):
+        digest.update(json.dumps(partition_signatures(transactions)).encode())
+        hashed = [rfm_path]
+    else:
+        hashed = paths
+    for path in hashed:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize_cluster_means(cluster_means):
+    # normalize means to 0-1, inverting recency so that higher is better for every metric
+    normalized = cluster_means.copy()
+    for col in CLUSTER_METRICS:
+        spread = cluster_means[col].max() - cluster_means[col].min()
+        # a single cluster (or equal means) has no spread, every cluster then scores 0
+        spread = spread if spread > 0 else 1.0
+        if col == "recency":
+            normalized[col] = (cluster_means[col].max() - cluster_means[col]) / spread
+        else:
+            normalized[col] = (cluster_means[col] - cluster_means[col].min()) / spread
+    return normalized.melt(id_vars=['labels_rfm_clustering'],
+                           value_vars=CLUSTER_METRICS,
+                           var_name='metric',
+                           value_name='normalized_mean')
+
+
+def generation_rollups(rfm_df, demographics):
+    """Accounts per generation and age statistics of the accounts in rfm_df."""
+    accounts = rfm_df[['acct_num']].merge(demographics[['acct_num', 'age', 'generation']], on='acct_num', how='left')
+    gen_counts = accounts['generation'].value_counts(sort=False).reset_index()
+    gen_counts.columns = ['generation', 'account_count']
+    gen_counts = gen_counts[gen_counts['account_count'] > 0]
+    age_stats = {
+        'mean': round(float(accounts['age'].mean()), 2),
+        'min': accounts['age'].min(),
+        'max': accounts['age'].max(),
+    }
+    return gen_counts, age_stats
+
+
+def category_rollups(df):
+    """Transaction count and total amount per category_group."""
+    counts_df = df['category_group'].value_counts().reset_index()
+    counts_df.columns = ['category_group', 'count']
+    amt_df = df.groupby('category_group', observed=True)['amt'].sum().reset_index()
+    amt_df.columns = ['category_group', 'amt']
+    return counts_df, amt_df
+
+
+def cluster_means(rfm_df):
+    return rfm_df.groupby('labels_rfm_clustering')[CLUSTER_METRICS].mean().reset_index()
+
+
+def compute_aggregates(df, rfm_df, demographics=None, rollups=None):
+    """Compute every rollup the Results page shows from the raw frames.
+
+    ``rollups`` can supply the category, monthly and date range rollups already
+    combined from the partitions (see partitions.py); df then only needs the
+    acct_num and dob columns.
+    """
+    with section("aggregates.demographics", rows=len(df)):
+        if demographics is None:
+            demographics = compute_demographics(df)
+    with section("aggregates.generation", rows=len(rfm_df)):
+        gen_counts, age_stats = generation_rollups(rfm_df, demographics)
+    if rollups is not None:
+        counts_df, amt_df = rollups['category_counts'], rollups['category_amounts']
+        monthly, date_range = rollups['monthly'], rollups['date_range']
+    else:
+        with section("aggregates.categories", rows=len(df)):
+            counts_df, amt_df = category_rollups(df)
+        with section("aggregates.monthly", rows=len(df)):
+            monthly = time_series(df, granularity="month")
+        date_range = (df['trans_datetime'].min().date(), df['trans_datetime'].max().date())
+    with section("aggregates.cluster_means", rows=len(rfm_df)):
+        means = cluster_means(rfm_df)
+    return {
+        'version': AGGREGATES_VERSION,
+        'account_count': len(rfm_df),
+        'age_stats': age_stats,
+        'generation_counts': gen_counts,
+        'category_counts': counts_df,
+        'category_amounts': amt_df,
+        'monthly': monthly,
+        'cluster_means': means,
+        'cluster_means_long': normalize_cluster_means(means),
+        # cluster label -> segment name, matched on the cluster mean profiles
+        'segment_names': name_segments(means),
+        # choices offered by the Results page filters
+        'date_range': date_range,
+        'job_types': sorted(rfm_df['job_type'].dropna().unique().tolist()),
+    }
+
+
+def _read_manifest():
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+
+def _replace_atomically(path, write, mode="w"):
+    # a unique tmp name, so a build in another process never renames this one away
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, mode) as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+def _write_manifest(manifest):
+    _replace_atomically(manifest_path, lambda f: json.dump(manifest, f, indent=2, sort_keys=True))
+
+
+def _is_current(fingerprint):
+    return all(os.path.exists(p) and list(file_signature(p)) == signature
+               for p, signature in json.loads(fingerprint).items())
+
+
+def _drop_stale(manifest):
+    """Manifest without the entries of replaced or deleted sources, and their artifacts removed."""
+    manifest = {key: entry for key, entry in manifest.items()
+                if entry['version'] == AGGREGATES_VERSION and _is_current(key)}
+    kept = {entry['path'] for entry in manifest.values()}
+    for old in glob.glob(os.path.join(glob.escape(aggregates_dir), "aggregates-v*-*.pkl")):
+        if os.path.basename(old) not in kept:
+            os.remove(old)
+    return manifest
+
+
+def artifact_path(data_hash):
+    return os.path.join(aggregates_dir, f"aggregates-v{AGGREGATES_VERSION}-{data_hash[:16]}.pkl")
+
+
+def build_aggregates(paths=None):
+    """Compute the rollups from the source files and write them as a versioned artifact.
+
+    Artifacts and manifest entries of sources that were replaced since are removed.
+    """
+    paths = paths or source_paths()
+    with _build_lock:
+        return _build_aggregates(paths)
+
+
+def _build_aggregates(paths):
+    data_hash = source_hash(paths)
+    path = artifact_path(data_hash)
+    if not os.path.exists(path):
+        transactions, rfm_path = paths[:-1], paths[-1]
+        if is_partitioned(transactions):
+            # categories, months and accounts come from the per-partition rollups, no transaction is read
+            aggs = compute_aggregates(partition_accounts(transactions), load_rfm(path=rfm_path),
+                                      load_demographics(paths=transactions), rollups=combined_rollups(transactions))
+        else:
+            aggs = compute_aggregates(load_transaction_files(transactions, TRANSACTION_COLUMNS), load_rfm(path=rfm_path),
+                                      load_demographics(paths=transactions))
+        aggs['source_hash'] = data_hash
+        os.makedirs(aggregates_dir, exist_ok=True)
+        _replace_atomically(path, lambda f: pickle.dump(aggs, f, protocol=pickle.HIGHEST_PROTOCOL), "wb")
+    manifest = _read_manifest()
+    manifest[source_fingerprint(paths)] = {'hash': data_hash, 'version': AGGREGATES_VERSION, 'path': os.path.basename(path)}
+    _write_manifest(_drop_stale(manifest))
+    return path
+
+
+def _read_artifact(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def _built_artifact(paths):
+    entry = _read_manifest().get(source_fingerprint(paths))
+    if entry and entry['version'] == AGGREGATES_VERSION and os.path.exists(os.path.join(aggregates_dir, entry['path'])):
+        return os.path.join(aggregates_dir, entry['path'])
+    return None
+
+
+def load_aggregates(paths=None):
+    """Return the rollups for the current source files, building them on first use."""
+    paths = paths or source_paths()
+    if not all(os.path.exists(p) for p in paths):
+        return None
+    path = _built_artifact(paths)
+    if path is None:
+        with _build_lock:
+            # a session waiting here finds the artifact the one before it just built
+            path = _built_artifact(paths) or _build_aggregates(paths)
+    return shared(("aggregates", path, *file_signature(path)), lambda: _read_artifact(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the precomputed Results page aggregates.")
+    parser.add_argument("--transactions", nargs="+", default=None,
+                        help="cc_clean.csv or monthly partition files, default data/cc_clean.csv or data/partitions/")
+    parser.add_argument("--rfm", default=cc_rfm_path, help="path to cc_rfm.csv")
+    args = parser.parse_args()
+    print(build_aggregates((args.transactions or transaction_paths()) + [args.rfm]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Simulate N concurrent Results page sessions and report process memory.
+
+Every simulated session loads the aggregates, the transactions and the filter
+index and runs a random filter, then holds on to what it loaded until all
+sessions are done, like concurrent users would. With the shared cache the
+resident memory should stay flat as N grows; ``--copy`` gives every session
+its own copy of the frames (what ``st.cache_data`` did) for comparison::
+
+    python -m benchmarks.load_test --rows 1e6 --sessions 1 2 4 8 16
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import resource
+import tempfile
+import threading
+
+import aggregates
+import data_loader
+import partitions
+from aggregates import TRANSACTION_COLUMNS, load_aggregates
+from benchmarks.synthetic import write_transactions
+from data_loader import load_rfm
+from partitions import load_transaction_files
+from query import POPULATION_BAND_LABELS, Filters, load_index
+from rfm_builder import build_rfm
+from segmentation import SegmentationModel
+from shared_cache import cache
+
+
+def rss_bytes():
+    """Current resident set size, from /proc where available."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # peak rather than current on platforms without /proc
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@contextlib.contextmanager
+def scratch_caches(tmp_dir):
+    """Point the aggregates, parquet and partition caches at tmp_dir, so a run leaves nothing in data/."""
+    settings = [
+        (aggregates, "aggregates_dir", os.path.join(tmp_dir, "aggregates")),
+        (aggregates, "manifest_path", os.path.join(tmp_dir, "aggregates", "manifest.json")),
+        (data_loader, "cache_dir", os.path.join(tmp_dir, "cache")),
+        (partitions, "partition_cache_dir", os.path.join(tmp_dir, "cache", "partitions")),
+        (partitions, "manifest_path", os.path.join(tmp_dir, "cache", "partitions", "manifest.json")),
+    ]
+    saved = [(module, name, getattr(module, name)) for module, name, _ in settings]
+    for module, name, value in settings:
+        setattr(module, name, value)
+    try:
+        yield
+    finally:
+        for module, name, value in saved:
+            setattr(module, name, value)
+
+
+def prepare_data(tmp_dir, n_rows, seed=0):
+    clean_path = write_transactions(os.path.join(tmp_dir, "cc_clean.csv"), n_rows, seed=seed)
+    rfm_df = build_rfm([clean_path])
+    rfm_df["labels_rfm_clustering"] = SegmentationModel(n_clusters=3, n_init=1).fit(rfm_df).predict(rfm_df)
+    rfm_path = os.path.join(tmp_dir, "cc_rfm.csv")
+    rfm_df.to_csv(rfm_path, index=False)
+    return [clean_path, rfm_path]
+
+
+def session(paths, rng, copy, held, barrier):
+    aggs = load_aggregates(paths)
+    df = load_transaction_files(paths[:-1], TRANSACTION_COLUMNS)
+    rfm_df = load_rfm(path=paths[-1])
+    if copy:
+        df, rfm_df = df.copy(deep=True), rfm_df.copy(deep=True)
+    filters = Filters(categories=tuple(rng.sample(aggs['category_counts']['category_group'].tolist(), 2)),
+                      population_bands=(rng.choice(POPULATION_BAND_LABELS),))
+    filtered = load_index(paths).aggregate(filters)
+    held.append((aggs, df, rfm_df, filtered))
+    barrier.wait()
+
+
+def run_sessions(paths, n, copy, seed):
+    held = []
+    barrier = threading.Barrier(n + 1)
+    threads = [threading.Thread(target=session, args=(paths, random.Random(seed + i), copy, held, barrier))
+               for i in range(n)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    # every session still holds its data here
+    rss = rss_bytes()
+    for t in threads:
+        t.join()
+    return rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory of N concurrent Results sessions.")
+    parser.add_argument("--rows", type=float, default=1e6, help="synthetic transactions")
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--copy", action="store_true", help="give every session its own copy of the frames")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir, scratch_caches(tmp_dir):
+        paths = prepare_data(tmp_dir, int(args.rows), args.seed)
+        cache.clear()
+        baseline = rss_bytes()
+        results = []
+        for n in args.sessions:
+            rss = run_sessions(paths, n, args.copy, args.seed)
+            results.append({"sessions": n, "rss_bytes": rss, "over_baseline_bytes": rss - baseline})
+            print(f"{n:>4} sessions  rss {rss / 2**20:9.1f} MiB  (+{(rss - baseline) / 2**20:.1f} MiB)")
+    report = {"rows": int(args.rows), "copy": args.copy, "cache": cache.stats(), "runs": results}
+    print(json.dumps(report["cache"]))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+"""Time and memory-profile every stage of the Results pipeline on synthetic data.
+
+::
+
+    python -m benchmarks.pipeline --rows 1e4 1e5 1e6 --output bench.json
+    python -m benchmarks.pipeline --rows 1e6 --baseline bench.json --output bench_new.json
+
+Each stage records wall time and peak traced memory. The two are measured in
+separate runs of the stage, since tracemalloc slows the code it traces several
+times over; ``--no-memory`` skips the traced run. With ``--baseline`` the run
+fails (exit code 1) when a stage is slower than the baseline by more than
+``--threshold``. The baseline is never overwritten: ``--output`` must be another
+file.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import pandas as pd
+
+from aggregates import category_rollups, cluster_means, compute_aggregates, generation_rollups
+from benchmarks.synthetic import write_transactions
+from charts import CHARTS, build_chart
+from data_loader import HAS_PARQUET, _read_cc_clean_csv
+from demographics import compute_demographics
+from rfm_builder import build_rfm
+from segmentation import SegmentationModel
+from timeseries import time_series
+
+
+class StageTimer:
+    """Runs stages one after the other and keeps wall time / peak memory for each.
+
+    The wall time comes from an untraced run; with ``memory`` the stage is run a
+    second time under tracemalloc for its peak. Stages must be safe to repeat.
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.stages = {}
+
+    def run(self, name, func, *args, rows=None):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        peak = None
+        if self.memory:
+            tracemalloc.start()
+            func(*args)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        self.stages[name] = {"seconds": elapsed, "peak_bytes": peak, "rows": rows}
+        return result
+
+
+def _load_parquet(csv_path, tmp_dir):
+    path = os.path.join(tmp_dir, "cc_clean.parquet")
+    _read_cc_clean_csv(csv_path).to_parquet(path, index=False)
+    return lambda: pd.read_parquet(path, memory_map=True)
+
+
+def bench_scale(n_rows, tmp_dir, seed=0, memory=True):
+    csv_path = os.path.join(tmp_dir, f"cc_clean_{n_rows}.csv")
+    timer = StageTimer(memory)
+    timer.run("generate", write_transactions, csv_path, n_rows, None, seed, rows=n_rows)
+
+    df = timer.run("load_csv", _read_cc_clean_csv, csv_path, rows=n_rows)
+    if HAS_PARQUET:
+        timer.run("load_parquet", _load_parquet(csv_path, tmp_dir), rows=n_rows)
+    rfm_df = timer.run("rfm_stream", build_rfm, [csv_path], rows=n_rows)
+    model = timer.run("segmentation", SegmentationModel(n_clusters=3, n_init=1).fit, rfm_df, rows=len(rfm_df))
+    rfm_df["labels_rfm_clustering"] = model.predict(rfm_df)
+
+    demographics = timer.run("demographics", compute_demographics, df, rows=n_rows)
+    timer.run("generation_rollups", generation_rollups, rfm_df, demographics, rows=len(rfm_df))
+    timer.run("monthly", time_series, df, rows=n_rows)
+    timer.run("category_rollups", category_rollups, df, rows=n_rows)
+    timer.run("cluster_means", cluster_means, rfm_df, rows=len(rfm_df))
+
+    aggs = compute_aggregates(df, rfm_df, demographics)
+    timer.run("chart_build", lambda: [build_chart(name, aggs).to_dict() for name in CHARTS], rows=None)
+    os.remove(csv_path)
+    return {"rows": n_rows, "accounts": len(rfm_df), "stages": timer.stages}
+
+
+def find_regressions(report, baseline, threshold):
+    """(scale, stage, ratio) for every stage slower than threshold x its baseline."""
+    previous = {run["rows"]: run["stages"] for run in baseline["runs"]}
+    regressions = []
+    for run in report["runs"]:
+        for stage, result in run["stages"].items():
+            base = previous.get(run["rows"], {}).get(stage)
+            if base and base["seconds"] > 0:
+                ratio = result["seconds"] / base["seconds"]
+                if ratio > threshold:
+                    regressions.append((run["rows"], stage, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Results pipeline on synthetic data.")
+    parser.add_argument("--rows", type=float, nargs="+", default=[1e4, 1e5, 1e6], help="scales to run, 1e4 to 1e8")
+    parser.add_argument("--output", default="bench_output.json", help="machine-readable report")
+    parser.add_argument("--baseline", help="earlier report to compare against")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed slowdown ratio against the baseline")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run of every stage")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline:
+        if os.path.abspath(args.baseline) == os.path.abspath(args.output):
+            parser.error("--output would overwrite the --baseline report, write the new report to another file")
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "runs": [],
+    }
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for rows in args.rows:
+            run = bench_scale(int(rows), tmp_dir, args.seed, memory=not args.no_memory)
+            report["runs"].append(run)
+            for stage, result in run["stages"].items():
+                peak = "" if result["peak_bytes"] is None else f" {result['peak_bytes'] / 2**20:10.1f} MiB"
+                print(f"{run['rows']:>11,} {stage:<20} {result['seconds']:9.3f} s{peak}")
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    if baseline is not None:
+        regressions = find_regressions(report, baseline, args.threshold)
+        for rows, stage, ratio in regressions:
+            print(f"REGRESSION {rows:,} rows, {stage}: {ratio:.2f}x slower than baseline")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Cold-start time of app.py per page, optionally against an older git revision.
+
+Each measurement runs the script in a fresh interpreter (bare mode, no server),
+with the sidebar radio forced to the page under test::
+
+    python benchmarks/startup.py --compare baseline --repeat 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ["Overall", "Introduction", "Methodology", "Scope & Limitations", "Results", "Proof of Concept"]
+
+# runs inside the child interpreter: time the streamlit import and the script separately
+PROBE = """
+import json, runpy, sys, time, warnings
+warnings.simplefilter("ignore")
+start = time.perf_counter()
+import streamlit as st
+imported = time.perf_counter()
+st.sidebar.radio = lambda *args, **kwargs: sys.argv[1]
+error = None
+try:
+    runpy.run_path("app.py", run_name="__main__")
+except BaseException as e:
+    error = repr(e)
+done = time.perf_counter()
+print(json.dumps({"streamlit_import": imported - start, "script": done - imported, "error": error}))
+"""
+
+
+def measure(app_dir, page, repeat):
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE, page], cwd=app_dir, capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {
+        "script_s": statistics.median(r["script"] for r in runs),
+        "total_s": statistics.median(r["streamlit_import"] + r["script"] for r in runs),
+        "error": runs[-1]["error"],
+    }
+
+
+def checkout(ref, target):
+    # export the revision without touching the working tree, data/ and images/ come from the current tree
+    archive = subprocess.run(["git", "archive", ref], cwd=REPO_DIR, capture_output=True, check=True).stdout
+    path = os.path.join(target, "archive.tar")
+    with open(path, "wb") as f:
+        f.write(archive)
+    with tarfile.open(path) as tar:
+        tar.extractall(target)
+    for name in ("data", "images"):
+        dest = os.path.join(target, name)
+        if os.path.isdir(dest) and not os.path.islink(dest):
+            subprocess.run(["rm", "-rf", dest], check=True)
+        os.symlink(os.path.join(REPO_DIR, name), dest)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app.py cold start per page.")
+    parser.add_argument("--compare", metavar="REF", help="also measure this git revision, e.g. the baseline commit")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per page, the median is reported")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {"current": {page: measure(REPO_DIR, page, args.repeat) for page in PAGES}}
+    if args.compare:
+        with tempfile.TemporaryDirectory() as tmp:
+            app_dir = checkout(args.compare, tmp)
+            results[args.compare] = {page: measure(app_dir, page, args.repeat) for page in PAGES}
+
+    for label, pages in results.items():
+        print(label)
+        for page, r in pages.items():
+            note = f"  ({r['error']})" if r["error"] else ""
+            print(f"  {page:<22} script {r['script_s'] * 1000:8.1f} ms   total {r['total_s'] * 1000:8.1f} ms{note}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
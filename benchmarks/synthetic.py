@@ -0,0 +1,94 @@
+"""Synthetic transactions in the cc_clean.csv schema, at any scale.
+
+Rows are generated and written in chunks, so 10^8 rows need no more memory
+than one chunk::
+
+    python -m benchmarks.synthetic 1000000 --output /tmp/cc_clean.csv
+"""
+import argparse
+import binascii
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["acct_num", "dob", "trans_datetime", "trans_num", "amt", "category_group", "city_pop", "job_type"]
+
+# the 7 transaction types and 8 job types from the Scope & Limitations page
+CATEGORY_GROUPS = ["entertainment", "transportation", "food_essentials", "health_wellness",
+                   "home_family", "shopping_miscellaneous", "others"]
+CATEGORY_WEIGHTS = [0.08, 0.07, 0.2, 0.08, 0.2, 0.3, 0.07]
+JOB_TYPES = ["Creative, Media & Design", "Education & Training", "Engineering & Infrastructure",
+             "Finance, Business & Management", "Healthcare & Wellbeing", "Public Service & Administration",
+             "Retail, Hospitality & Customer Service", "Science, Technology & IT"]
+
+START = pd.Timestamp("2020-01-01")
+END = pd.Timestamp("2021-12-07 23:59:59")
+CHUNK_SIZE = 1_000_000
+
+
+def default_accounts(n_rows):
+    # the shipped data has 88 accounts for roughly a thousand transactions each
+    return max(88, n_rows // 1000)
+
+
+def make_accounts(n_accounts, rng):
+    """Per-account attributes that stay fixed across all of an account's transactions."""
+    # distinct 12 digit account numbers like the shipped data
+    acct_num = 10**11 + rng.choice(9 * 10**11, size=n_accounts, replace=False)
+    dob = pd.to_datetime("1925-01-01") + pd.to_timedelta(rng.integers(0, 80 * 365, n_accounts), unit="D")
+    return pd.DataFrame({
+        "acct_num": acct_num,
+        "dob": dob.strftime("%d/%m/%Y"),
+        "city_pop": np.round(rng.lognormal(11, 1.5, n_accounts)).astype(np.int64) + 100,
+        "job_type": rng.choice(JOB_TYPES, n_accounts),
+        # some accounts transact far more often than others
+        "activity": rng.gamma(0.8, 1.0, n_accounts),
+    })
+
+
+def generate_chunk(accounts, n_rows, rng):
+    p = accounts["activity"].to_numpy()
+    idx = rng.choice(len(accounts), size=n_rows, p=p / p.sum())
+    seconds = rng.integers(0, int((END - START).total_seconds()), n_rows)
+    trans_datetime = np.datetime64(START, "s") + seconds.astype("timedelta64[s]")
+    trans_num = np.frombuffer(binascii.hexlify(rng.bytes(16 * n_rows)), dtype="S32").astype(str)
+    return pd.DataFrame({
+        "acct_num": accounts["acct_num"].to_numpy()[idx],
+        "dob": accounts["dob"].to_numpy()[idx],
+        "trans_datetime": np.datetime_as_string(trans_datetime, unit="s"),
+        "trans_num": trans_num,
+        "amt": np.round(rng.lognormal(3.8, 1.1, n_rows), 2),
+        "category_group": rng.choice(CATEGORY_GROUPS, n_rows, p=CATEGORY_WEIGHTS),
+        "city_pop": accounts["city_pop"].to_numpy()[idx],
+        "job_type": accounts["job_type"].to_numpy()[idx],
+    }, columns=COLUMNS)
+
+
+def generate_transactions(n_rows, n_accounts=None, seed=0, chunk_size=CHUNK_SIZE):
+    """Yield DataFrame chunks totalling n_rows synthetic transactions."""
+    rng = np.random.default_rng(seed)
+    accounts = make_accounts(n_accounts or default_accounts(n_rows), rng)
+    for start in range(0, n_rows, chunk_size):
+        yield generate_chunk(accounts, min(chunk_size, n_rows - start), rng)
+
+
+def write_transactions(path, n_rows, n_accounts=None, seed=0, chunk_size=CHUNK_SIZE):
+    """Write n_rows synthetic transactions to a CSV file, one chunk at a time."""
+    for i, chunk in enumerate(generate_transactions(n_rows, n_accounts, seed, chunk_size)):
+        chunk.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic cc_clean.csv transactions.")
+    parser.add_argument("rows", type=float, help="number of transactions, e.g. 1e6")
+    parser.add_argument("--output", default="cc_clean_synthetic.csv")
+    parser.add_argument("--accounts", type=int, default=None, help="number of accounts, default rows / 1000")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    print(write_transactions(args.output, int(args.rows), args.accounts, args.seed, args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
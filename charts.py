@@ -0,0 +1,136 @@
+"""Altair charts of the Results page, built from the aggregates and cached as Vega-Lite specs.
+
+A spec is keyed on the chart name and the hash of the aggregate data, so a
+rerun reuses the already built and validated spec instead of rebuilding it.
+"""
+import altair as alt
+import streamlit as st
+
+from aggregates import CLUSTER_METRICS
+from demographics import GENERATION_LABELS
+from profiling import section
+from timeseries import MONTH_MAP
+
+# charts must only ever embed rollups, never raw transactions
+MAX_CHART_ROWS = 5000
+
+
+def generation_chart(gen_counts):
+    return alt.Chart(gen_counts).mark_bar().encode(
+        x=alt.X('generation:N', title='Generation', sort=GENERATION_LABELS, axis=alt.Axis(labelAngle=0)),
+        y=alt.Y('account_count:Q', title='Number of Accounts'),
+        tooltip=['generation', 'account_count']  # Optional: show details on hover
+    ).properties(
+        width=500,
+        height=400,
+        title='Account Distribution by Generation'
+    )
+
+
+def category_count_chart(counts_df):
+    return alt.Chart(counts_df).mark_bar().encode(
+        x=alt.X('count:Q', title='Transaction Count'),
+        y=alt.Y('category_group:N', sort='-x', title='Category Group'),
+        tooltip=['category_group', 'count']
+    ).properties(
+        width=600,
+        height=400
+    )
+
+
+def category_amount_chart(amt_df):
+    return alt.Chart(amt_df).mark_bar().encode(
+        x=alt.X('amt:Q', title='Total Transaction Amount'),
+        y=alt.Y('category_group:N', sort='-x', title='Category Group'),
+        tooltip=['category_group', 'amt']
+    ).properties(
+        width=600,
+        height=400
+    )
+
+
+def year_range(monthly):
+    years = sorted(monthly['year'].unique())
+    return f"{years[0]}-{years[-1]}" if years else ""
+
+
+def _monthly_chart(monthly, value, y_title, title):
+    # keep only the columns the chart uses so they are all that gets embedded in the spec
+    data = monthly[['month_name', 'year', value]]
+    base = alt.Chart(data).encode(
+        x=alt.X('month_name:N',
+                title='Month',
+                sort=list(MONTH_MAP.values()),
+                axis=alt.Axis(labelAngle=0)),
+        y=alt.Y(f'{value}:Q', title=y_title),
+        tooltip=['month_name', value, 'year']
+    )
+    return base.mark_line(point=True).encode(
+        color=alt.Color('year:N',
+                        title='Year',
+                        scale=alt.Scale(domain=sorted(data['year'].unique())))
+    ).properties(
+        width=600,
+        height=400,
+        title=f'{title} ({year_range(monthly)})'
+    )
+
+
+def monthly_count_chart(monthly):
+    return _monthly_chart(monthly, 'trans_count', 'Transaction Count', 'Transaction Counts by Month')
+
+
+def monthly_amount_chart(monthly):
+    return _monthly_chart(monthly, 'total_amt', 'Total Amount Spent', 'Total Amount Spent by Month')
+
+
+def cluster_means_chart(cluster_means_long):
+    # faceted bar chart with narrower bars
+    return alt.Chart(cluster_means_long).mark_bar(size=20).encode(
+        x=alt.X('labels_rfm_clustering:N', title='Cluster Label'),
+        y=alt.Y('normalized_mean:Q', title='Normalized Mean (0-1)', scale=alt.Scale(domain=[0, 1])),
+        color=alt.Color('labels_rfm_clustering:N', title='Cluster'),
+        column=alt.Column('metric:N', title='Metric',
+                          sort=CLUSTER_METRICS)
+    ).properties(
+        width=160,  # Narrow facet width
+        height=300,
+        title='Normalized Mean Metrics by Cluster (Recency Inverted)'
+    ).configure_axis(
+        labelAngle=0  # Horizontal labels
+    )
+
+
+# chart name -> (aggregate key, builder)
+CHARTS = {
+    'generation': ('generation_counts', generation_chart),
+    'category_counts': ('category_counts', category_count_chart),
+    'category_amounts': ('category_amounts', category_amount_chart),
+    'monthly_counts': ('monthly', monthly_count_chart),
+    'monthly_amounts': ('monthly', monthly_amount_chart),
+    'cluster_means': ('cluster_means_long', cluster_means_chart),
+}
+
+
+def build_chart(name, aggs):
+    key, builder = CHARTS[name]
+    data = aggs[key]
+    if len(data) > MAX_CHART_ROWS:
+        raise ValueError(f"{name} chart would embed {len(data)} rows, charts must be built from aggregates")
+    return builder(data)
+
+
+@st.cache_resource(show_spinner=False, max_entries=256)
+def _chart_spec(name, data_key, _aggs):
+    return build_chart(name, _aggs).to_dict()
+
+
+def chart_spec(name, aggs, data_key=None):
+    """Vega-Lite spec of a Results chart, reused across reruns and sessions for the same data."""
+    return _chart_spec(name, data_key or aggs['source_hash'], aggs)
+
+
+def show_chart(name, aggs, data_key=None, use_container_width=True):
+    with section(f"chart.{name}"):
+        st.vega_lite_chart(chart_spec(name, aggs, data_key), use_container_width=use_container_width)
+
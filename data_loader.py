@@ -0,0 +1,140 @@
+import glob
+import hashlib
+import os
+
+import pandas as pd
+from profiling import section
+from shared_cache import shared
+
+try:
+    import pyarrow  # noqa: F401
+    HAS_PARQUET = True
+except ImportError:
+    HAS_PARQUET = False
+
+data_dir = "data"
+cache_dir = os.path.join(data_dir, ".cache")
+
+cc_clean_path = os.path.join(data_dir, "cc_clean.csv")
+cc_rfm_path = os.path.join(data_dir, "cc_rfm.csv")
+
+# explicit dtypes so pandas does not have to infer them from every row
+# acct_num is stored as "124000000000.0" in the exports, so it is read as float and cast afterwards
+CC_CLEAN_DTYPES = {
+    "acct_num": "float64",
+    "amt": "float64",
+    "category_group": "category",
+    "city_pop": "int64",
+    "job_type": "category",
+}
+CC_RFM_DTYPES = {
+    "acct_num": "float64",
+    "job_type": "category",
+    "shop_category": "category",
+    "labels_rfm_clustering": "int64",
+}
+DOB_FORMAT = "%d/%m/%Y"
+
+
+def file_signature(path):
+    # (mtime, size) is cheap to compute and changes whenever the file is replaced
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def parse_dates(series, format=None):
+    # parse each distinct value once and broadcast back, dob repeats on every transaction of an account
+    codes, uniques = pd.factorize(series)
+    parsed = pd.to_datetime(uniques, format=format)
+    values = parsed.take(codes, allow_fill=True, fill_value=pd.NaT)
+    return pd.Series(values, index=series.index, name=series.name)
+
+
+def _read_cc_clean_csv(path, columns=None):
+    usecols = list(columns) if columns else None
+    dtypes = {c: t for c, t in CC_CLEAN_DTYPES.items() if usecols is None or c in usecols}
+    df = pd.read_csv(path, usecols=usecols, dtype=dtypes)
+    if "acct_num" in df:
+        df["acct_num"] = df["acct_num"].astype("int64")
+    if "dob" in df:
+        df["dob"] = parse_dates(df["dob"], format=DOB_FORMAT)
+    if "trans_datetime" in df:
+        df["trans_datetime"] = pd.to_datetime(df["trans_datetime"])
+    return df
+
+
+def _read_cc_rfm_csv(path, columns=None):
+    usecols = list(columns) if columns else None
+    dtypes = {c: t for c, t in CC_RFM_DTYPES.items() if usecols is None or c in usecols}
+    rfm_df = pd.read_csv(path, usecols=usecols, dtype=dtypes)
+    if "acct_num" in rfm_df:
+        rfm_df["acct_num"] = rfm_df["acct_num"].astype("int64")
+    return rfm_df
+
+
+def _parquet_prefix(csv_path):
+    # the absolute path is part of the name, so two different files called cc_rfm.csv never share a cache
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    path_hash = hashlib.sha1(os.path.abspath(csv_path).encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{name}-{path_hash}")
+
+
+def parquet_path(csv_path):
+    mtime_ns, size = file_signature(csv_path)
+    return f"{_parquet_prefix(csv_path)}-{mtime_ns}-{size}.parquet"
+
+
+def _ensure_parquet(csv_path, reader):
+    # one-time conversion of the csv to parquet, the name carries the csv's (mtime, size) so any change misses
+    pq_path = parquet_path(csv_path)
+    if os.path.exists(pq_path):
+        return pq_path
+    frame = reader(csv_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = pq_path + ".tmp"
+    frame.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, pq_path)
+    # drop the copies of earlier versions of the same csv
+    for old in glob.glob(glob.escape(_parquet_prefix(csv_path)) + "-*.parquet"):
+        if old != pq_path:
+            os.remove(old)
+    return pq_path
+
+
+def _read(csv_path, reader, columns):
+    with section(f"load.{os.path.basename(csv_path)}") as s:
+        if not HAS_PARQUET:
+            frame = reader(csv_path, columns)
+        else:
+            pq_path = _ensure_parquet(csv_path, reader)
+            # column-pruned, memory-mapped read instead of re-parsing the csv
+            frame = pd.read_parquet(pq_path, columns=list(columns) if columns else None, memory_map=True)
+        s.rows = len(frame)
+    return frame
+
+
+def _load(path, reader, columns):
+    # one shared, read-only frame per (file version, columns) for the whole process
+    columns = tuple(columns) if columns else None
+    key = ("frame", path, *file_signature(path), columns)
+    return shared(key, lambda: _read(path, reader, columns))
+
+
+def load_transactions(columns=None, path=cc_clean_path):
+    """Load cc_clean.csv, memoized on path + mtime + size. Returns None if the file is missing.
+
+    The frame is shared with every other session; treat it as read-only.
+    """
+    if not os.path.exists(path):
+        return None
+    return _load(path, _read_cc_clean_csv, columns)
+
+
+def load_rfm(columns=None, path=cc_rfm_path):
+    """Load cc_rfm.csv, memoized on path + mtime + size. Returns None if the file is missing.
+
+    The frame is shared with every other session; treat it as read-only.
+    """
+    if not os.path.exists(path):
+        return None
+    return _load(path, _read_cc_rfm_csv, columns)
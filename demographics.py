@@ -0,0 +1,61 @@
+"""Per-account age, year of birth and generation, shared by every page."""
+import os
+
+import numpy as np
+import pandas as pd
+from data_loader import DOB_FORMAT, file_signature, parse_dates
+from partitions import is_partitioned, load_transaction_files, partition_accounts, transaction_paths
+from shared_cache import shared
+
+# "Current date set to January 01, 2022" on the Scope & Limitations page
+REFERENCE_DATE = pd.Timestamp("2022-01-01")
+
+# (generation, last birth year) in chronological order, the last one is open ended
+GENERATIONS = [
+    ('Greatest', 1927),
+    ('Silent', 1945),
+    ('Baby Boomer', 1964),
+    ('Gen X', 1981),
+    ('Millennial', 1996),
+    ('Gen Z', 2012),
+    ('Gen Alpha', None),
+]
+GENERATION_LABELS = [label for label, _ in GENERATIONS]
+
+
+def assign_generation(yob, generations=GENERATIONS):
+    # right-closed bins from -inf so nobody born before 1901 or after 1981 falls through
+    edges = [-np.inf] + [last for _, last in generations[:-1]] + [np.inf]
+    labels = [label for label, _ in generations]
+    return pd.cut(yob, bins=edges, labels=labels)
+
+
+def compute_demographics(df, reference_date=REFERENCE_DATE, generations=GENERATIONS):
+    """One row per acct_num with dob, yob, age (reference year - yob) and generation."""
+    # reduce to the distinct (acct_num, dob) pairs before doing any date work
+    accounts = df[['acct_num', 'dob']].drop_duplicates()
+    dob = accounts['dob']
+    if not pd.api.types.is_datetime64_any_dtype(dob):
+        dob = parse_dates(dob, format=DOB_FORMAT)
+    accounts = accounts.assign(dob=dob, yob=dob.dt.year)
+    # an account with conflicting dobs keeps the latest one, as the Results page always did;
+    # a missing dob sorts first so it never replaces a known one
+    accounts = accounts.sort_values('yob', na_position='first').drop_duplicates('acct_num', keep='last')
+    accounts['age'] = pd.Timestamp(reference_date).year - accounts['yob']
+    accounts['generation'] = assign_generation(accounts['yob'], generations)
+    return accounts.sort_values('acct_num').reset_index(drop=True)
+
+
+def load_demographics(reference_date=REFERENCE_DATE, paths=None):
+    """Demographics table of the transaction files (cc_clean.csv or the partitions), computed once per file version.
+
+    Partitions are read through their per-partition account files, not the transactions.
+    """
+    paths = paths or transaction_paths()
+    if not all(os.path.exists(p) for p in paths):
+        return None
+    reference_date = pd.Timestamp(reference_date)
+    key = ("demographics", tuple((p, *file_signature(p)) for p in paths), reference_date)
+    if is_partitioned(paths):
+        return shared(key, lambda: compute_demographics(partition_accounts(paths), reference_date))
+    return shared(key, lambda: compute_demographics(load_transaction_files(paths, ['acct_num', 'dob']), reference_date))
@@ -0,0 +1,49 @@
+"""Display-sized copies of the images in images/, so pages never ship the full-size files."""
+import os
+import tempfile
+
+image_dir = "images"
+image_cache_dir = os.path.join(image_dir, ".cache")
+
+
+def resized_image(path, width, quality=85):
+    """Downscaled copy of an image for display, written once next to the original under .cache/.
+
+    Falls back to the original file when Pillow is not available. The copy is
+    written under a temporary name and renamed, so a concurrent first view never
+    serves a half-written file.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return path
+    stamp = int(os.path.getmtime(path))
+    name = os.path.splitext(os.path.basename(path))[0]
+    out_base = os.path.join(image_cache_dir, f"{name}-{width}w-{stamp}")
+    for ext in (".png", ".jpg"):
+        if os.path.exists(out_base + ext):
+            return out_base + ext
+    os.makedirs(image_cache_dir, exist_ok=True)
+    with Image.open(path) as img:
+        # keep png only where transparency has to survive, jpeg is far smaller otherwise
+        has_alpha = img.mode in ("RGBA", "LA", "P")
+        if img.width > width:
+            img = img.resize((width, round(img.height * width / img.width)), Image.LANCZOS)
+        if has_alpha:
+            out = out_base + ".png"
+            # a palette png keeps the transparency at a fraction of the size of rgba
+            img = img.convert("RGBA").quantize(colors=256, method=Image.Quantize.FASTOCTREE)
+            options = {"format": "PNG", "optimize": True}
+        else:
+            out = out_base + ".jpg"
+            img = img.convert("RGB")
+            options = {"format": "JPEG", "quality": quality, "optimize": True}
+        fd, tmp_path = tempfile.mkstemp(dir=image_cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                img.save(f, **options)
+            os.replace(tmp_path, out)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    return out
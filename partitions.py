@@ -0,0 +1,301 @@
+"""Transactions delivered as one file per month under ``data/partitions/``.
+
+Drop the monthly CSV or Parquet files (any names, e.g. ``cc_clean-2021-03.csv``)
+in ``data/partitions/`` instead of a single ``data/cc_clean.csv``, then::
+
+    python partitions.py ingest --workers 4
+
+New or changed partitions are converted to Parquet and rolled up (rows, date
+range, per-category and per-month totals, distinct accounts and dobs) in a
+process pool. The manifest in ``data/.cache/partitions/`` records what every
+partition already produced, so later runs only process new files and the
+aggregates are combined from the per-partition rollups without rereading old
+months. Reads with a date range skip
+the partitions whose [min, max] dates cannot match.
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pandas as pd
+from data_loader import (DOB_FORMAT, HAS_PARQUET, _read_cc_clean_csv, cache_dir, cc_clean_path, data_dir,
+                         file_signature, load_transactions, parse_dates)
+from profiling import section
+from shared_cache import shared
+from timeseries import monthly_from_totals
+
+# bump whenever the manifest entries change so every partition is processed again
+MANIFEST_VERSION = 2
+
+partitions_dir = os.path.join(data_dir, "partitions")
+partition_cache_dir = os.path.join(cache_dir, "partitions")
+manifest_path = os.path.join(partition_cache_dir, "manifest.json")
+
+PARTITION_EXTENSIONS = (".csv", ".parquet")
+
+# one ingest at a time per process, sessions building aggregates may race here
+_ingest_lock = threading.Lock()
+
+
+def partition_paths(directory=partitions_dir):
+    """Partition files in the directory, sorted by name."""
+    if not os.path.isdir(directory):
+        return []
+    return [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+            if name.endswith(PARTITION_EXTENSIONS)]
+
+
+def transaction_paths():
+    """The transaction files the app reads: cc_clean.csv if present, otherwise the monthly partitions."""
+    partitions = partition_paths()
+    if partitions and not os.path.exists(cc_clean_path):
+        return partitions
+    return [cc_clean_path]
+
+
+def is_partitioned(paths):
+    return len(paths) > 1 or os.path.dirname(os.path.abspath(paths[0])) == os.path.abspath(partitions_dir)
+
+
+def _read_partition(path, columns=None):
+    if not path.endswith(".parquet"):
+        return _read_cc_clean_csv(path, columns)
+    df = pd.read_parquet(path, columns=list(columns) if columns else None)
+    # partitions exported by other tools may not carry the cc_clean dtypes
+    if "acct_num" in df:
+        df["acct_num"] = df["acct_num"].astype("int64")
+    if "dob" in df and not pd.api.types.is_datetime64_any_dtype(df["dob"]):
+        df["dob"] = parse_dates(df["dob"], format=DOB_FORMAT)
+    if "trans_datetime" in df and not pd.api.types.is_datetime64_any_dtype(df["trans_datetime"]):
+        df["trans_datetime"] = pd.to_datetime(df["trans_datetime"])
+    return df
+
+
+def _partition_cache_path(path, suffix=""):
+    # the absolute path is part of the name, so partitions with the same file name never share a cache
+    name = os.path.splitext(os.path.basename(path))[0]
+    path_hash = hashlib.sha1(os.path.abspath(path).encode()).hexdigest()[:12]
+    return os.path.join(partition_cache_dir, f"{name}-{path_hash}{suffix}.parquet")
+
+
+def _write_parquet(df, path):
+    os.makedirs(partition_cache_dir, exist_ok=True)
+    df.to_parquet(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+    return path
+
+
+def _ingest_partition(path):
+    """Convert one partition to parquet and roll it up. Runs in a worker process."""
+    df = _read_partition(path)
+    accounts = df[["acct_num", "dob"]].drop_duplicates()
+    dates = df["trans_datetime"]
+    by_category = df.groupby("category_group", observed=True)["amt"].agg(["size", "sum"])
+    by_month = df.groupby([dates.dt.year.rename("year"), dates.dt.month.rename("month")])["amt"].agg(["size", "sum"])
+    entry = {
+        "signature": list(file_signature(path)),
+        "rows": len(df),
+        "min_date": str(dates.min().date()) if len(df) else None,
+        "max_date": str(dates.max().date()) if len(df) else None,
+        "category_counts": {str(k): int(v) for k, v in by_category["size"].items()},
+        "category_amounts": {str(k): float(v) for k, v in by_category["sum"].items()},
+        "monthly": [[int(y), int(m), int(n), float(s)] for (y, m), n, s in
+                    zip(by_month.index, by_month["size"], by_month["sum"])],
+        "parquet": None,
+        # distinct (acct_num, dob) pairs, so the demographics never reread the transactions
+        "accounts": None,
+    }
+    if HAS_PARQUET:
+        if not path.endswith(".parquet"):
+            entry["parquet"] = _write_parquet(df, _partition_cache_path(path))
+        entry["accounts"] = _write_parquet(accounts, _partition_cache_path(path, "-accounts"))
+    return path, entry
+
+
+def _read_manifest():
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    return manifest["partitions"] if manifest.get("version") == MANIFEST_VERSION else {}
+
+
+def _write_manifest(entries):
+    os.makedirs(partition_cache_dir, exist_ok=True)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": MANIFEST_VERSION, "partitions": entries}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def ingest(paths=None, workers=None):
+    """Process the new or changed partitions; returns ({path: manifest entry}, paths processed)."""
+    paths = partition_paths() if paths is None else list(paths)
+    with _ingest_lock:
+        entries = _read_manifest()
+        # forget partitions that were deleted, with their parquet copies
+        for key in [k for k in entries if not os.path.exists(k)]:
+            entry = entries.pop(key)
+            for pq_path in (entry["parquet"], entry["accounts"]):
+                if pq_path and os.path.exists(pq_path):
+                    os.remove(pq_path)
+        stale = [p for p in paths if entries.get(os.path.abspath(p), {}).get("signature") != list(file_signature(p))]
+        if stale:
+            with section("partitions.ingest", rows=len(stale)):
+                if workers == 1 or len(stale) == 1:
+                    results = [_ingest_partition(p) for p in stale]
+                else:
+                    with ProcessPoolExecutor(max_workers=workers) as pool:
+                        results = list(pool.map(_ingest_partition, stale))
+            for path, entry in results:
+                entries[os.path.abspath(path)] = entry
+            _write_manifest(entries)
+        return {p: entries[os.path.abspath(p)] for p in paths}, stale
+
+
+def _overlaps(entry, start, end):
+    if entry["min_date"] is None:
+        return False
+    return (start is None or entry["max_date"] >= str(pd.Timestamp(start).date())) and \
+        (end is None or entry["min_date"] <= str(pd.Timestamp(end).date()))
+
+
+def _in_range(df, start, end):
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df["trans_datetime"] >= pd.Timestamp(start)
+    if end is not None:
+        # the end date is inclusive
+        mask &= df["trans_datetime"] < pd.Timestamp(end) + pd.Timedelta(days=1)
+    return df[mask].reset_index(drop=True)
+
+
+def _read_partitions(paths, entries, columns, start, end):
+    read_columns = columns
+    if columns and (start is not None or end is not None) and "trans_datetime" not in columns:
+        read_columns = list(columns) + ["trans_datetime"]
+
+    def read(path):
+        pq_path = entries[path]["parquet"]
+        if pq_path and os.path.exists(pq_path):
+            return _read_partition(pq_path, read_columns)
+        return _read_partition(path, read_columns)
+
+    with section("partitions.read", rows=sum(entries[p]["rows"] for p in paths)):
+        # parquet and csv parsing release the GIL, threads are enough here
+        with ThreadPoolExecutor() as pool:
+            frames = list(pool.map(read, paths))
+    if not frames:
+        return pd.DataFrame(columns=list(columns) if columns else [])
+    df = pd.concat(frames, ignore_index=True)
+    # categories differ between months, concat falls back to object
+    for col in ("category_group", "job_type"):
+        if col in df and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    if start is not None or end is not None:
+        df = _in_range(df, start, end)
+    return df[list(columns)] if columns else df
+
+
+def overlapping_partitions(paths, start=None, end=None):
+    """The partitions whose [min, max] dates can hold transactions in [start, end], from the manifest."""
+    entries, _ = ingest(paths)
+    return [p for p in paths if _overlaps(entries[p], start, end)]
+
+
+def load_transaction_files(paths, columns=None, start=None, end=None):
+    """Transactions from cc_clean.csv or the monthly partitions, optionally limited to [start, end].
+
+    Partitions outside the date range are never read. Returns None if a file is
+    missing. The frame is shared with every other session; treat it as read-only.
+    """
+    if not paths or not all(os.path.exists(p) for p in paths):
+        return None
+    columns = tuple(columns) if columns else None
+    if not is_partitioned(paths):
+        if start is None and end is None:
+            return load_transactions(columns, path=paths[0])
+        read_columns = columns and tuple(dict.fromkeys(columns + ("trans_datetime",)))
+        df = _in_range(load_transactions(read_columns, path=paths[0]), start, end)
+        return df[list(columns)] if columns else df
+    entries, _ = ingest(paths)
+    selected = [p for p in paths if _overlaps(entries[p], start, end)]
+    start = pd.Timestamp(start) if start is not None else None
+    end = pd.Timestamp(end) if end is not None else None
+    key = ("partitions", tuple((p, *file_signature(p)) for p in selected), columns, start, end)
+    return shared(key, lambda: _read_partitions(selected, entries, columns, start, end))
+
+
+def _read_accounts(paths, entries):
+    def read(path):
+        accounts_path = entries[path]["accounts"]
+        if accounts_path and os.path.exists(accounts_path):
+            return pd.read_parquet(accounts_path)
+        return _read_partition(path, ["acct_num", "dob"]).drop_duplicates()
+
+    with section("partitions.accounts", rows=len(paths)):
+        frames = [read(p) for p in paths]
+    if not frames:
+        return pd.DataFrame(columns=["acct_num", "dob"])
+    return pd.concat(frames, ignore_index=True).drop_duplicates(ignore_index=True)
+
+
+def partition_accounts(paths):
+    """Distinct (acct_num, dob) pairs of the partitions, from the small per-partition files written at ingest."""
+    entries, _ = ingest(paths)
+    key = ("partition_accounts", tuple((p, *entries[p]["signature"]) for p in paths))
+    return shared(key, lambda: _read_accounts(paths, entries))
+
+
+def partition_signatures(paths):
+    """(absolute path, mtime_ns, size) of every partition as recorded by the manifest, after ingesting the new ones."""
+    entries, _ = ingest(paths)
+    return [(os.path.abspath(p), *entries[p]["signature"]) for p in paths]
+
+
+def combined_rollups(paths):
+    """Category, monthly and date range rollups of all the partitions, from the manifest."""
+    entries, _ = ingest(paths)
+    counts, amounts, monthly = {}, {}, []
+    for entry in entries.values():
+        for category, n in entry["category_counts"].items():
+            counts[category] = counts.get(category, 0) + n
+        for category, amt in entry["category_amounts"].items():
+            amounts[category] = amounts.get(category, 0.0) + amt
+        monthly.extend(entry["monthly"])
+    counts_df = pd.DataFrame(list(counts.items()), columns=["category_group", "count"]) \
+        .sort_values("count", ascending=False, ignore_index=True)
+    amt_df = pd.DataFrame(sorted(amounts.items()), columns=["category_group", "amt"])
+    dated = [e for e in entries.values() if e["min_date"] is not None]
+    date_range = (pd.Timestamp(min(e["min_date"] for e in dated)).date(),
+                  pd.Timestamp(max(e["max_date"] for e in dated)).date()) if dated else (None, None)
+    return {
+        "category_counts": counts_df,
+        "category_amounts": amt_df,
+        "monthly": monthly_from_totals(pd.DataFrame(monthly, columns=["year", "month", "trans_count", "total_amt"])),
+        "date_range": date_range,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest the monthly transaction partitions.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest_parser = sub.add_parser("ingest", help="convert and roll up new or changed partitions")
+    ingest_parser.add_argument("paths", nargs="*", help="partition files, default every file in data/partitions/")
+    ingest_parser.add_argument("--workers", type=int, default=None, help="worker processes, default one per CPU")
+    sub.add_parser("status", help="list the partitions known to the manifest")
+    args = parser.parse_args()
+
+    if args.command == "ingest":
+        entries, processed = ingest(args.paths or None, workers=args.workers)
+        print(f"{len(processed)} of {len(entries)} partitions processed")
+    else:
+        for path, entry in sorted(_read_manifest().items()):
+            print(f"{entry['min_date']} .. {entry['max_date']}  {entry['rows']:>10} rows  {path}")
+
+
+if __name__ == "__main__":
+    main()
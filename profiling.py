@@ -0,0 +1,177 @@
+"""Per-section wall time, rows and peak memory, aggregated across reruns and sessions.
+
+Wrap a section of a page::
+
+    with section("results.load") as s:
+        aggs = load_aggregates()
+        s.rows = aggs['account_count']
+
+or a function with ``@profiled("aggregates.compute")``. Profiling is off unless
+the ``APP_PROFILE`` environment variable is set; while off, ``section`` returns
+a shared no-op context. Scripts then record every section, the app only the
+runs of the sessions opened with ``?debug=1`` (see ``enable``).
+
+Peak memory is only recorded with ``APP_PROFILE_MEMORY=1`` as well, because
+tracemalloc slows everything in the process down several times over while it
+runs. It is approximate when sections nest or sessions run concurrently.
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextvars import ContextVar
+
+_available = os.environ.get("APP_PROFILE", "") not in ("", "0")
+_memory = _available and os.environ.get("APP_PROFILE_MEMORY", "") not in ("", "0")
+# whether the current script run records, set by enable() at the top of every app run
+_enabled = ContextVar("profiling_enabled", default=_available)
+_lock = threading.Lock()
+# section name -> running totals, shared by every session of the process
+_stats = {}
+
+
+class _Noop:
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _Noop()
+
+
+class _Section:
+    def __init__(self, name, rows):
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        if _memory:
+            self._mem_start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self._start
+        peak = max(tracemalloc.get_traced_memory()[1] - self._mem_start, 0) if _memory else None
+        _record(self.name, elapsed, self.rows, peak)
+        return False
+
+
+def _record(name, seconds, rows, peak_bytes):
+    with _lock:
+        s = _stats.setdefault(name, {"calls": 0, "seconds_total": 0.0, "seconds_max": 0.0,
+                                     "seconds_last": 0.0, "rows_total": 0, "peak_bytes_max": 0})
+        s["calls"] += 1
+        s["seconds_total"] += seconds
+        s["seconds_max"] = max(s["seconds_max"], seconds)
+        s["seconds_last"] = seconds
+        s["rows_total"] += rows or 0
+        if peak_bytes is not None:
+            s["peak_bytes_max"] = max(s["peak_bytes_max"], peak_bytes)
+
+
+def enable(on=True):
+    """Record the sections of the current script run (one session's rerun in the app).
+
+    Ignored unless ``APP_PROFILE`` is set, so a query parameter alone cannot
+    turn profiling on. Returns whether the run records.
+    """
+    _enabled.set(on and _available)
+    return is_enabled()
+
+
+def is_enabled():
+    return _enabled.get()
+
+
+def is_available():
+    return _available
+
+
+def section(name, rows=None):
+    """Context manager timing a block; set ``.rows`` on the returned handle to record rows processed."""
+    if not _enabled.get():
+        return _NOOP
+    if _memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    return _Section(name, rows)
+
+
+def profiled(name=None):
+    """Decorator form of ``section``."""
+    def decorator(func):
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled.get():
+                return func(*args, **kwargs)
+            with section(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def snapshot():
+    with _lock:
+        return {name: dict(s) for name, s in _stats.items()}
+
+
+def reset():
+    with _lock:
+        _stats.clear()
+
+
+def to_json():
+    return json.dumps(snapshot(), indent=2, sort_keys=True)
+
+
+def to_prometheus(prefix="app_section"):
+    """Stats in the Prometheus text exposition format."""
+    metrics = [
+        ("calls_total", "counter", "calls", "Number of times the section ran."),
+        ("seconds_total", "counter", "seconds_total", "Total wall time spent in the section."),
+        ("seconds_max", "gauge", "seconds_max", "Slowest single run of the section."),
+        ("rows_total", "counter", "rows_total", "Rows processed by the section."),
+    ]
+    if _memory:
+        metrics.append(("peak_bytes", "gauge", "peak_bytes_max", "Largest traced memory peak of the section."))
+    stats = snapshot()
+    lines = []
+    for suffix, kind, key, help_text in metrics:
+        lines.append(f"# HELP {prefix}_{suffix} {help_text}")
+        lines.append(f"# TYPE {prefix}_{suffix} {kind}")
+        for name, s in sorted(stats.items()):
+            label = name.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'{prefix}_{suffix}{{section="{label}"}} {s[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def render_debug_panel():
+    """Sidebar table of the collected stats with JSON / Prometheus downloads."""
+    import pandas as pd
+    import streamlit as st
+
+    with st.sidebar.expander("Debug: section timings"):
+        stats = snapshot()
+        if not stats:
+            st.write("No sections recorded yet.")
+            return
+        table = pd.DataFrame.from_dict(stats, orient="index")
+        table["seconds_mean"] = table["seconds_total"] / table["calls"]
+        columns = ["calls", "seconds_last", "seconds_mean", "seconds_max", "rows_total"]
+        if _memory:
+            table["peak_mib"] = table["peak_bytes_max"] / 2**20
+            columns.append("peak_mib")
+        st.dataframe(table[columns])
+        st.download_button("JSON", to_json(), file_name="section_timings.json", mime="application/json")
+        st.download_button("Prometheus", to_prometheus(), file_name="section_timings.prom", mime="text/plain")
+        if st.button("Reset timings"):
+            reset()
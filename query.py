@@ -0,0 +1,229 @@
+"""In-memory index of the transactions for the Results page filters.
+
+Transactions are sorted by date once, so a date range is a binary search and a
+contiguous slice; monthly partitions outside the range are not even read. Every
+other dimension is a small integer code: account level ones (generation, job
+type, cluster, city population band) are resolved on the accounts table and
+gathered through each transaction's account code, and category_group is a
+per-code lookup table. The filtered rollups are then plain
+``np.bincount`` calls, in the same layout as ``aggregates.compute_aggregates``.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+from aggregates import (CLUSTER_METRICS, TRANSACTION_COLUMNS, normalize_cluster_means, source_fingerprint,
+                        source_paths)
+from data_loader import load_rfm
+from demographics import GENERATION_LABELS, load_demographics
+from partitions import is_partitioned, load_transaction_files, overlapping_partitions
+from shared_cache import shared
+from timeseries import MONTH_MAP
+
+# (band, upper bound of city_pop), the last band is open ended
+POPULATION_BANDS = [
+    ("Small (< 50k)", 50_000),
+    ("Mid-sized (50k - 500k)", 500_000),
+    ("Large (500k+)", None),
+]
+POPULATION_BAND_LABELS = [label for label, _ in POPULATION_BANDS]
+
+# None means "no filter" for every field; the others are tuples of allowed values
+Filters = namedtuple("Filters", ["start", "end", "generations", "job_types", "categories", "clusters", "population_bands"],
+                     defaults=(None,) * 7)
+
+
+def population_band(city_pop):
+    edges = [-np.inf] + [upper for _, upper in POPULATION_BANDS[:-1]] + [np.inf]
+    return pd.cut(city_pop, bins=edges, labels=POPULATION_BAND_LABELS, right=False)
+
+
+def _codes(values, categories):
+    return pd.Categorical(values, categories=categories).codes
+
+
+def _lookup(allowed, universe):
+    # one slot per code plus a trailing slot that code -1 (missing) indexes into
+    if allowed is None:
+        return None
+    table = np.zeros(len(universe) + 1, dtype=bool)
+    table[[i for i, value in enumerate(universe) if value in set(allowed)]] = True
+    return table
+
+
+class Selection:
+    """Rows [lo, hi) of the date-sorted arrays, optionally narrowed to explicit positions."""
+
+    def __init__(self, lo, hi, positions=None):
+        self.lo, self.hi, self.positions = lo, hi, positions
+
+    def __len__(self):
+        return self.hi - self.lo if self.positions is None else len(self.positions)
+
+    def take(self, values):
+        return values[self.lo:self.hi] if self.positions is None else values[self.positions]
+
+
+class TransactionIndex:
+    def __init__(self, df, rfm_df, demographics):
+        order = np.argsort(df['trans_datetime'].to_numpy(), kind='stable')
+        dates = df['trans_datetime'].to_numpy()[order]
+        self.dates = dates.astype('datetime64[ns]').view('int64')
+        self.amt = df['amt'].to_numpy(dtype=float)[order]
+
+        categories = df['category_group'].astype('category')
+        self.categories = list(categories.cat.categories)
+        self.category_code = categories.cat.codes.to_numpy()[order]
+
+        stamps = pd.DatetimeIndex(dates)
+        self.first_year = int(stamps.year.min()) if len(stamps) else 0
+        self.month_code = ((stamps.year - self.first_year) * 12 + stamps.month - 1).to_numpy().astype(np.int32)
+
+        # account level dimensions, one row per account code
+        self.accounts = np.union1d(rfm_df['acct_num'].to_numpy(), df['acct_num'].unique())
+        self.acct_code = np.searchsorted(self.accounts, df['acct_num'].to_numpy()[order]).astype(np.int32)
+        columns = ['acct_num', 'job_type', 'labels_rfm_clustering'] + CLUSTER_METRICS
+        acct = pd.DataFrame({'acct_num': self.accounts}) \
+            .merge(rfm_df[columns].drop_duplicates('acct_num'), on='acct_num', how='left') \
+            .merge(demographics[['acct_num', 'age', 'generation']], on='acct_num', how='left')
+        self.generation_code = _codes(acct['generation'], GENERATION_LABELS)
+        self.job_types = sorted(acct['job_type'].dropna().unique().tolist())
+        self.job_code = _codes(acct['job_type'], self.job_types)
+        labels = acct['labels_rfm_clustering'].astype('Int64')
+        self.clusters = sorted(labels.dropna().unique().tolist())
+        self.cluster_code = _codes(labels, self.clusters)
+        self.band_code = _codes(population_band(acct['city_pop']), POPULATION_BAND_LABELS)
+        self.age = acct['age'].to_numpy(dtype=float)
+        self.metrics = acct[CLUSTER_METRICS].to_numpy(dtype=float)
+
+    @property
+    def nbytes(self):
+        return sum(v.nbytes for v in vars(self).values() if isinstance(v, np.ndarray))
+
+    @property
+    def date_range(self):
+        if not len(self.dates):
+            return None, None
+        return pd.Timestamp(self.dates[0]).date(), pd.Timestamp(self.dates[-1]).date()
+
+    def _account_mask(self, filters):
+        mask = None
+        for allowed, universe, codes in (
+            (filters.generations, GENERATION_LABELS, self.generation_code),
+            (filters.job_types, self.job_types, self.job_code),
+            (filters.clusters, self.clusters, self.cluster_code),
+            (filters.population_bands, POPULATION_BAND_LABELS, self.band_code),
+        ):
+            table = _lookup(allowed, universe)
+            if table is not None:
+                mask = table[codes] if mask is None else mask & table[codes]
+        return mask
+
+    def select(self, filters):
+        """Rows matching the filters, without scanning outside the date range."""
+        lo, hi = 0, len(self.dates)
+        if filters.start is not None:
+            lo = int(np.searchsorted(self.dates, pd.Timestamp(filters.start).value, side='left'))
+        if filters.end is not None:
+            # the end date is inclusive
+            end = (pd.Timestamp(filters.end) + pd.Timedelta(days=1)).value
+            hi = max(lo, int(np.searchsorted(self.dates, end, side='left')))
+        mask = None
+        account_mask = self._account_mask(filters)
+        if account_mask is not None:
+            mask = account_mask[self.acct_code[lo:hi]]
+        category_table = _lookup(filters.categories, self.categories)
+        if category_table is not None:
+            in_category = category_table[self.category_code[lo:hi]]
+            mask = in_category if mask is None else mask & in_category
+        if mask is None:
+            return Selection(lo, hi)
+        return Selection(lo, hi, lo + np.flatnonzero(mask))
+
+    def _monthly(self, selection):
+        months = selection.take(self.month_code)
+        if not len(months):
+            return pd.DataFrame(columns=['date', 'year', 'month', 'trans_count', 'total_amt', 'avg_amt', 'month_name'])
+        n_months = int(months.max()) + 1
+        counts = np.bincount(months, minlength=n_months)
+        sums = np.bincount(months, weights=selection.take(self.amt), minlength=n_months)
+        # full calendar of every year that has a selected transaction
+        years = np.unique(months // 12) + self.first_year
+        codes = ((years[:, None] - self.first_year) * 12 + np.arange(12)).ravel()
+        counts = np.append(counts, 0)[np.minimum(codes, n_months)]
+        sums = np.append(sums, 0.0)[np.minimum(codes, n_months)]
+        year = np.repeat(years, 12)
+        month = np.tile(np.arange(1, 13), len(years))
+        monthly = pd.DataFrame({
+            'date': pd.to_datetime({'year': year, 'month': month, 'day': 1}),
+            'year': year.astype(str),
+            'month': month,
+            'trans_count': counts.astype(int),
+            'total_amt': sums,
+            'avg_amt': np.divide(sums, counts, out=np.full(len(sums), np.nan), where=counts > 0),
+        })
+        monthly['month_name'] = monthly['month'].map(MONTH_MAP)
+        return monthly
+
+    def aggregate(self, filters):
+        """Results page rollups for the filtered rows, same keys as compute_aggregates."""
+        selection = self.select(filters)
+        acct = selection.take(self.acct_code)
+        present = np.bincount(acct, minlength=len(self.accounts)) > 0
+
+        category = selection.take(self.category_code)
+        # code -1 is a missing category_group, left out of the rollups like groupby does
+        known = category >= 0
+        cat_counts = np.bincount(category[known], minlength=len(self.categories))
+        cat_amounts = np.bincount(category[known], weights=selection.take(self.amt)[known],
+                                  minlength=len(self.categories))
+        counts_df = pd.DataFrame({'category_group': self.categories, 'count': cat_counts})
+        counts_df = counts_df[counts_df['count'] > 0].sort_values('count', ascending=False, ignore_index=True)
+        amt_df = pd.DataFrame({'category_group': self.categories, 'amt': cat_amounts})[cat_counts > 0].reset_index(drop=True)
+
+        generation = self.generation_code[present]
+        gen_counts = np.bincount(generation[generation >= 0], minlength=len(GENERATION_LABELS))
+        gen_df = pd.DataFrame({'generation': GENERATION_LABELS, 'account_count': gen_counts})
+        gen_df = gen_df[gen_df['account_count'] > 0]
+        ages = self.age[present]
+
+        clustered = present & (self.cluster_code >= 0)
+        means = pd.DataFrame(self.metrics[clustered], columns=CLUSTER_METRICS)
+        means.insert(0, 'labels_rfm_clustering', np.array(self.clusters, dtype=int)[self.cluster_code[clustered]])
+        means = means.groupby('labels_rfm_clustering')[CLUSTER_METRICS].mean().reset_index()
+
+        return {
+            'account_count': int(present.sum()),
+            'transaction_count': len(selection),
+            'age_stats': {
+                'mean': round(float(np.nanmean(ages)), 2) if np.isfinite(ages).any() else float('nan'),
+                'min': np.nanmin(ages) if np.isfinite(ages).any() else float('nan'),
+                'max': np.nanmax(ages) if np.isfinite(ages).any() else float('nan'),
+            },
+            'generation_counts': gen_df,
+            'category_counts': counts_df,
+            'category_amounts': amt_df,
+            'monthly': self._monthly(selection),
+            'cluster_means': means,
+            'cluster_means_long': normalize_cluster_means(means),
+        }
+
+
+def _build_index(paths):
+    df = load_transaction_files(paths[:-1], TRANSACTION_COLUMNS)
+    return TransactionIndex(df, load_rfm(path=paths[-1]), load_demographics(paths=paths[:-1]))
+
+
+def load_index(paths=None, start=None, end=None):
+    """Index of the current data files, built once per data version and shared by all sessions.
+
+    With a date range, only the monthly partitions that can match it are read and
+    indexed; filter the result with the same dates.
+    """
+    paths = paths or source_paths()
+    transactions = paths[:-1]
+    if (start is not None or end is not None) and is_partitioned(transactions):
+        # with no partition in range one is kept, the date search then selects nothing from it
+        transactions = overlapping_partitions(transactions, start, end) or transactions[:1]
+        paths = transactions + paths[-1:]
+    return shared(("index", source_fingerprint(paths)), lambda: _build_index(paths))
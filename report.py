@@ -0,0 +1,216 @@
+"""Headless Results report: the Results page charts and tables as static files in ``plots/``.
+
+Runs the same aggregation as the Results page, without a browser or a
+Streamlit session, e.g. from a nightly cron job::
+
+    python report.py --format png --workers 4
+    python report.py --start 2021-01-01 --end 2021-06-30 --pdf
+
+The precomputed aggregates are reused (see aggregates.py) and a chart is only
+rendered again when its Vega-Lite spec changed, so a run on unchanged data is
+mostly reading two small files. Charts are rendered in a process pool with
+vl-convert (``pip install vl-convert-python``); without it the HTML report
+embeds the specs and draws them in the browser with vega-embed.
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from aggregates import load_aggregates
+from charts import CHARTS, build_chart, year_range
+from profiling import section
+from query import Filters, load_index
+from segmentation import SEGMENT_DESCRIPTIONS
+
+try:
+    import vl_convert  # noqa: F401
+    HAS_VL_CONVERT = True
+except ImportError:
+    HAS_VL_CONVERT = False
+
+plot_dir = "plots"
+
+# (chart, heading) in the order of the Results page
+SECTIONS = [
+    ('generation', "Demographic Profile of Adobo Bank Customers"),
+    ('category_counts', "Customer Total Transaction Counts per Category"),
+    ('category_amounts', "Customer Total Transaction Amounts per Category"),
+    ('monthly_counts', "Customer Transaction Count per Year"),
+    ('monthly_amounts', "Total Amount Spent per Month"),
+    ('cluster_means', "K-Means Clustering: Mean Metrics by Cluster (Inverted Recency)"),
+]
+
+VEGA_EMBED_SCRIPTS = """<script src="https://cdn.jsdelivr.net/npm/vega@5"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega-lite@5"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega-embed@6"></script>"""
+
+
+def report_aggregates(filters=Filters()):
+    """Aggregates as shown on the Results page for the filters, plus the segment names of all accounts."""
+    aggs = load_aggregates()
+    if aggs is None:
+        return None
+    segment_names = aggs['segment_names']
+    if filters != Filters():
+        aggs = load_index(start=filters.start, end=filters.end).aggregate(filters)
+    return {**aggs, 'segment_names': segment_names}
+
+
+def _spec_hash(spec):
+    return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+def _render(spec, fmt, path):
+    # runs in a worker process
+    import vl_convert as vlc
+
+    if fmt == "svg":
+        with open(path, "w") as f:
+            f.write(vlc.vegalite_to_svg(spec))
+    else:
+        with open(path, "wb") as f:
+            f.write(vlc.vegalite_to_png(spec, scale=2))
+    return path
+
+
+def render_charts(specs, fmt="png", workers=None, out_dir=plot_dir):
+    """Render the specs to out_dir/<name>.<fmt>, skipping the ones unchanged since the last run."""
+    os.makedirs(out_dir, exist_ok=True)
+    # chart name -> hash of the spec its image was rendered from
+    manifest_path = os.path.join(out_dir, ".rendered.json")
+    rendered = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            rendered = json.load(f)
+    paths, todo = {}, []
+    for name, spec in specs.items():
+        paths[name] = os.path.join(out_dir, f"{name}.{fmt}")
+        key = f"{_spec_hash(spec)}.{fmt}"
+        if rendered.get(name) != key or not os.path.exists(paths[name]):
+            todo.append((name, key))
+    if todo:
+        with section("report.render", rows=len(todo)):
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_render, specs[name], fmt, paths[name]) for name, _ in todo]
+                for future in futures:
+                    future.result()
+        rendered.update(todo)
+        with open(manifest_path, "w") as f:
+            json.dump(rendered, f, indent=2, sort_keys=True)
+    return paths
+
+
+def _table(df):
+    return df.to_html(index=False, border=0, classes="table", float_format=lambda x: f"{x:,.2f}")
+
+
+def segment_table(segment_names):
+    """Cluster Analysis table of the Results page, one row per cluster label."""
+    return pd.DataFrame([{'Cluster': label, 'Cluster Label': name, **SEGMENT_DESCRIPTIONS.get(name, {})}
+                         for label, name in sorted(segment_names.items())])
+
+
+def write_html(aggs, specs, images, path, title="Results"):
+    """HTML report, with the rendered images or, without them, the specs drawn by vega-embed."""
+    parts = [f"<h1>{html.escape(title)}</h1>"]
+    if 'transaction_count' in aggs:
+        parts.append(f"<p>{aggs['account_count']} accounts and {aggs['transaction_count']:,} transactions "
+                     "matching the report filters.</p>")
+    for name, heading in SECTIONS:
+        if name == 'monthly_amounts':
+            heading = f"{heading} ({year_range(aggs['monthly'])})"
+        parts.append(f"<h2>{html.escape(heading)}</h2>")
+        if name in images:
+            parts.append(f'<img src="{html.escape(os.path.relpath(images[name], os.path.dirname(path)))}" alt="{name}">')
+        else:
+            parts.append(f'<div id="{name}"></div>'
+                         f'<script>vegaEmbed("#{name}", {json.dumps(specs[name])}, {{actions: false}});</script>')
+        if name == 'generation':
+            stats = aggs['age_stats']
+            parts.append(f"<p>Population age mean {stats['mean']}, min {stats['min']}, max {stats['max']}</p>")
+    parts.append("<h2>Mean Metrics by Cluster</h2>")
+    parts.append(_table(aggs['cluster_means']))
+    parts.append("<h2>Cluster Analysis</h2>")
+    parts.append(_table(segment_table(aggs['segment_names'])))
+    head = "" if len(images) == len(specs) else VEGA_EMBED_SCRIPTS
+    with open(path, "w") as f:
+        f.write(f"<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>{html.escape(title)}</title>\n"
+                f"<style>body{{font-family:sans-serif;max-width:1100px;margin:auto}}"
+                f".table td,.table th{{padding:2px 8px;text-align:left}}</style>\n{head}</head>\n"
+                f"<body>\n" + "\n".join(parts) + "\n</body></html>\n")
+    return path
+
+
+def write_pdf(images, path):
+    """One page per rendered PNG chart, through matplotlib so no extra dependency is needed."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    with PdfPages(path) as pdf:
+        for name, heading in SECTIONS:
+            if name not in images:
+                continue
+            image = plt.imread(images[name])
+            fig = plt.figure(figsize=(11.69, 8.27))  # A4 landscape
+            ax = fig.add_axes([0.03, 0.03, 0.94, 0.88])
+            ax.imshow(image)
+            ax.axis("off")
+            fig.suptitle(heading)
+            pdf.savefig(fig)
+            plt.close(fig)
+    return path
+
+
+def build_report(filters=Filters(), fmt="png", workers=None, pdf=False, out_dir=plot_dir):
+    """Write the report into out_dir and return the paths written."""
+    if pdf and (not HAS_VL_CONVERT or fmt != "png"):
+        raise ValueError("the PDF report needs vl-convert and --format png")
+    with section("report.aggregates"):
+        aggs = report_aggregates(filters)
+    if aggs is None:
+        raise FileNotFoundError("No data file found. Please add the CSV files to the `data/` directory.")
+    specs = {name: build_chart(name, aggs).to_dict() for name in CHARTS}
+    os.makedirs(out_dir, exist_ok=True)
+    images = render_charts(specs, fmt, workers, out_dir) if HAS_VL_CONVERT else {}
+    written = list(images.values())
+    written.append(write_html(aggs, specs, images, os.path.join(out_dir, "report.html")))
+    if pdf:
+        written.append(write_pdf(images, os.path.join(out_dir, "report.pdf")))
+    return written
+
+
+def _date(value):
+    return pd.Timestamp(value).date()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write the Results page as a static report into plots/.")
+    parser.add_argument("--format", choices=["png", "svg"], default="png", help="chart image format")
+    parser.add_argument("--workers", type=int, default=None, help="render processes, default one per CPU")
+    parser.add_argument("--pdf", action="store_true", help="also write plots/report.pdf (png charts only)")
+    parser.add_argument("--out", default=plot_dir, help="output directory")
+    parser.add_argument("--start", type=_date, help="first transaction date, like the Results page filter")
+    parser.add_argument("--end", type=_date, help="last transaction date (inclusive)")
+    parser.add_argument("--category", nargs="+", help="category groups to keep")
+    parser.add_argument("--generation", nargs="+", help="generations to keep")
+    args = parser.parse_args()
+
+    filters = Filters(start=args.start, end=args.end,
+                      categories=tuple(args.category) if args.category else None,
+                      generations=tuple(args.generation) if args.generation else None)
+    if not HAS_VL_CONVERT:
+        print("vl-convert not installed, charts are drawn by vega-embed when report.html is opened")
+    for path in build_report(filters, args.format, args.workers, args.pdf, args.out):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
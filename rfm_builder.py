@@ -0,0 +1,246 @@
+"""Build the RFM / CLV table (cc_rfm.csv layout) by streaming the raw transactions.
+
+Only per-account accumulators are kept in memory, so memory grows with the
+number of accounts and not with the number of transactions::
+
+    python rfm_builder.py data/cc_clean.csv --output data/cc_rfm_built.csv
+
+With ``--incremental`` the accumulators of the previous run are reloaded and
+only the input files not folded in yet (by path, mtime and size) are read, every
+row of them whatever its date, so late or back-dated transactions are kept.
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from data_loader import CC_CLEAN_DTYPES, data_dir, file_signature
+from demographics import REFERENCE_DATE
+from partitions import transaction_paths
+
+rfm_state_path = os.path.join(data_dir, "models", "rfm_state.npz")
+
+CHUNK_SIZE = 1_000_000
+RFM_COLUMNS = ["acct_num", "trans_datetime", "amt", "city_pop", "job_type"]
+
+
+def iter_chunks(path, chunk_size=CHUNK_SIZE, columns=RFM_COLUMNS):
+    """Yield the transactions of a CSV or Parquet file in fixed-size DataFrame chunks."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+        return
+    dtypes = {c: t for c, t in CC_CLEAN_DTYPES.items() if c in columns}
+    for chunk in pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunk_size):
+        chunk["acct_num"] = chunk["acct_num"].astype("int64")
+        chunk["trans_datetime"] = pd.to_datetime(chunk["trans_datetime"])
+        yield chunk
+
+
+class RFMAccumulator:
+    """Running first/last transaction, count and total per account in compact NumPy arrays."""
+
+    def __init__(self, capacity=1024):
+        self.accounts = pd.Index([], dtype="int64")
+        self.first = np.empty(capacity, dtype="int64")
+        self.last = np.empty(capacity, dtype="int64")
+        self.count = np.zeros(capacity, dtype="int64")
+        self.total = np.zeros(capacity, dtype="float64")
+        self.city_pop = np.zeros(capacity, dtype="int64")
+        self.job_code = np.full(capacity, -1, dtype="int32")
+        self.job_types = []
+        # absolute path -> (mtime_ns, size) of every file folded in, used by the incremental mode
+        self.files = {}
+
+    def __len__(self):
+        return len(self.accounts)
+
+    def _grow(self, size):
+        capacity = len(self.count)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity)
+        for name in ("first", "last", "count", "total", "city_pop", "job_code"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        self.job_code[len(self.accounts):] = -1
+
+    def _slots(self, acct_nums):
+        slots = self.accounts.get_indexer(acct_nums)
+        new = slots < 0
+        if new.any():
+            start = len(self.accounts)
+            self._grow(start + int(new.sum()))
+            self.accounts = self.accounts.append(pd.Index(acct_nums[new], dtype="int64"))
+            slots[new] = np.arange(start, len(self.accounts))
+            self.first[slots[new]] = np.iinfo("int64").max
+            self.last[slots[new]] = np.iinfo("int64").min
+        return slots
+
+    def _job_codes(self, job_types):
+        known = {name: code for code, name in enumerate(self.job_types)}
+        codes = []
+        for name in job_types:
+            if name not in known:
+                known[name] = len(self.job_types)
+                self.job_types.append(name)
+            codes.append(known[name])
+        return np.array(codes, dtype="int32")
+
+    def update(self, chunk):
+        """Fold one chunk of transactions into the accumulators."""
+        ts = chunk["trans_datetime"].to_numpy(dtype="datetime64[ns]").view("int64")
+        if chunk.empty:
+            return
+        by_acct = chunk.assign(ts=ts).groupby("acct_num", sort=False).agg(
+            first=("ts", "min"), last=("ts", "max"), count=("amt", "size"), total=("amt", "sum"),
+            city_pop=("city_pop", "last"), job_type=("job_type", "last"))
+        slots = self._slots(by_acct.index.to_numpy())
+        self.first[slots] = np.minimum(self.first[slots], by_acct["first"].to_numpy())
+        self.last[slots] = np.maximum(self.last[slots], by_acct["last"].to_numpy())
+        self.count[slots] += by_acct["count"].to_numpy()
+        self.total[slots] += by_acct["total"].to_numpy()
+        self.city_pop[slots] = by_acct["city_pop"].to_numpy()
+        self.job_code[slots] = self._job_codes(by_acct["job_type"].astype(str))
+
+    def fold_file(self, path, chunk_size=CHUNK_SIZE):
+        """Fold a whole file in unless it already was; returns whether it was read.
+
+        A file that changed since it was folded in cannot be subtracted again, so
+        that raises instead of counting its transactions twice.
+        """
+        key, signature = os.path.abspath(path), tuple(file_signature(path))
+        if key in self.files:
+            if self.files[key] == signature:
+                return False
+            raise ValueError(f"{path} changed since it was folded in, rebuild without --incremental")
+        for chunk in iter_chunks(path, chunk_size):
+            self.update(chunk)
+        self.files[key] = signature
+        return True
+
+    def save(self, path=rfm_state_path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        n = len(self.accounts)
+        np.savez(path, accounts=self.accounts.to_numpy(), first=self.first[:n], last=self.last[:n],
+                 count=self.count[:n], total=self.total[:n], city_pop=self.city_pop[:n],
+                 job_code=self.job_code[:n], job_types=np.array(self.job_types, dtype=str),
+                 file_paths=np.array(list(self.files), dtype=str),
+                 file_signatures=np.array(list(self.files.values()), dtype="int64").reshape(-1, 2))
+        return path
+
+    @classmethod
+    def load(cls, path=rfm_state_path):
+        acc = cls()
+        with np.load(path, allow_pickle=False) as saved:
+            if "file_paths" not in saved:
+                raise ValueError(f"{path} was written by an older version, rebuild without --incremental")
+            acc.accounts = pd.Index(saved["accounts"], dtype="int64")
+            for name in ("first", "last", "count", "total", "city_pop", "job_code"):
+                setattr(acc, name, saved[name].copy())
+            acc.job_types = saved["job_types"].tolist()
+            acc.files = {p: tuple(int(v) for v in sig) for p, sig in zip(saved["file_paths"].tolist(),
+                                                                          saved["file_signatures"])}
+        return acc
+
+    def to_frame(self, reference_date=REFERENCE_DATE):
+        """RFM table with the CLV formula from the Scope & Limitations page."""
+        n = len(self.accounts)
+        reference = pd.Timestamp(reference_date).value
+        day = pd.Timedelta(days=1).value
+        frequency = self.count[:n]
+        total_amt = self.total[:n]
+        tenure = (reference - self.first[:n]) // day
+        avg_spend = total_amt / frequency
+        job_types = np.array(self.job_types + [None], dtype=object)
+        rfm_df = pd.DataFrame({
+            "acct_num": self.accounts.to_numpy(),
+            "recency": (reference - self.last[:n]) // day,
+            "frequency": frequency,
+            "total_amt": total_amt,
+            "avg_spend": avg_spend,
+            "tenure": tenure,
+            # Average spending x Frequency / Customer Tenure
+            "clv": avg_spend * frequency / np.maximum(tenure, 1),
+            "city_pop": self.city_pop[:n],
+            "job_type": pd.Categorical(job_types[self.job_code[:n]]),
+        })
+        return add_scores(rfm_df)
+
+
+# recency in days: within a month scores 3, within a quarter 2, older 1
+RECENCY_BINS = [-np.inf, 30, 90, np.inf]
+
+
+def _tertile(values):
+    # right-closed tertiles of the values themselves, so equal values always share a score; a heavily
+    # tied column (tenure) has repeated edges, which are merged into fewer scores
+    return pd.qcut(values, 3, labels=False, duplicates="drop").astype("int64") + 1
+
+
+def add_scores(rfm_df):
+    """Score columns as defined by the shipped cc_rfm.csv.
+
+    frequency, monetary and tenure scores are 1-3 tertiles, recency_score follows
+    RECENCY_BINS, population_group (1-3) splits city_pop at its tertiles with the
+    edges going to the upper group, rfm_score is 3-9 and rfm_level 1 for score 3,
+    2 for 4-6 and 3 for 7-9.
+    """
+    rfm_df["recency_score"] = pd.cut(rfm_df["recency"], bins=RECENCY_BINS, labels=[3, 2, 1]).astype("int64")
+    rfm_df["frequency_score"] = _tertile(rfm_df["frequency"])
+    rfm_df["monetary_score"] = _tertile(rfm_df["total_amt"])
+    rfm_df["rfm_score"] = rfm_df["recency_score"] + rfm_df["frequency_score"] + rfm_df["monetary_score"]
+    rfm_df["rfm_level"] = pd.cut(rfm_df["rfm_score"], bins=[0, 3, 6, 9], labels=[1, 2, 3]).astype("int64")
+    rfm_df["tenure_score"] = _tertile(rfm_df["tenure"])
+    city_pop = rfm_df["city_pop"].to_numpy(dtype=float)
+    rfm_df["population_group"] = np.digitize(city_pop, np.quantile(city_pop, [1 / 3, 2 / 3])).astype("int64") + 1
+    return rfm_df[["acct_num", "recency", "recency_score", "frequency", "frequency_score", "total_amt",
+                   "monetary_score", "rfm_score", "rfm_level", "avg_spend", "tenure", "clv", "population_group",
+                   "tenure_score", "job_type", "city_pop"]]
+
+
+def build_rfm(paths, chunk_size=CHUNK_SIZE, state_path=None, reference_date=REFERENCE_DATE):
+    """Stream the transaction files into an RFM table, resuming from ``state_path`` if it exists.
+
+    Files already folded into the saved state are skipped; their paths are in
+    ``rfm_df.attrs["skipped_files"]``.
+    """
+    if state_path and os.path.exists(state_path):
+        acc = RFMAccumulator.load(state_path)
+    else:
+        acc = RFMAccumulator()
+    skipped = [path for path in paths if not acc.fold_file(path, chunk_size)]
+    if state_path:
+        acc.save(state_path)
+    rfm_df = acc.to_frame(reference_date)
+    rfm_df.attrs["skipped_files"] = skipped
+    return rfm_df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the RFM table from raw transactions in chunks.")
+    parser.add_argument("paths", nargs="*", default=None,
+                        help="transaction CSV or Parquet files, default data/cc_clean.csv or data/partitions/")
+    parser.add_argument("--output", default=os.path.join(data_dir, "cc_rfm_built.csv"), help="where to write the RFM table")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="transactions per chunk")
+    parser.add_argument("--incremental", action="store_true", help="resume from the saved accumulators and only add new transactions")
+    parser.add_argument("--state", default=rfm_state_path, help="accumulator state file used by --incremental")
+    parser.add_argument("--reference-date", default=str(REFERENCE_DATE.date()), help="'current date' for recency and tenure")
+    args = parser.parse_args()
+
+    if not args.incremental and os.path.exists(args.state):
+        os.remove(args.state)
+    rfm_df = build_rfm(args.paths or transaction_paths(), args.chunk_size, args.state, pd.Timestamp(args.reference_date))
+    rfm_df.to_csv(args.output, index=False)
+    for path in rfm_df.attrs["skipped_files"]:
+        print(f"already folded in, skipped: {path}")
+    print(f"{len(rfm_df)} accounts -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Credit card recommendation: assign a customer profile to the nearest segment centroid.
+
+The model is a handful of centroids, so scoring is one small matrix product and
+thousands of profiles can be scored per call. ``python scoring.py`` exposes it
+as a JSON endpoint::
+
+    curl -d '{"profiles": [{"recency": 20, "frequency": 900, ...}]}' localhost:8502/score
+"""
+import argparse
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import os
+
+import numpy as np
+
+from data_loader import cc_rfm_path, file_signature, load_rfm
+from segmentation import SEGMENT_FEATURES, name_segments
+from shared_cache import shared
+
+# segment -> card, from the Results page "Credit Card Expansion Recommendation"
+SEGMENT_CARDS = {
+    "Luxury Essentials Enthusiast": "Gold Lifestyle Card",
+    "Premium Shopper & Leisure Seeker": "Signature Luxe Card",
+    "Smart Essentials Spender": "Elite Rewards Card",
+}
+
+# observation window of the transactions, January 2020 to December 2021
+OBSERVATION_DAYS = 730
+DAYS_PER_MONTH = 365.25 / 12
+
+
+def profile_from_habits(transactions_per_month, avg_spend, tenure_days, recency_days, city_pop):
+    """Turn the habits a customer can enter in a form into the segmentation features.
+
+    Accepts scalars or equal-length arrays and returns an (n, 7) array in SEGMENT_FEATURES order.
+    """
+    tenure = np.maximum(np.asarray(tenure_days, dtype=float), 1)
+    frequency = np.asarray(transactions_per_month, dtype=float) * np.minimum(tenure, OBSERVATION_DAYS) / DAYS_PER_MONTH
+    avg_spend = np.asarray(avg_spend, dtype=float)
+    total_amt = frequency * avg_spend
+    clv = avg_spend * frequency / tenure
+    return np.column_stack(np.broadcast_arrays(recency_days, frequency, total_amt, avg_spend, tenure, clv, city_pop)).astype(float)
+
+
+class CardRecommender:
+    """Nearest-centroid scorer over standardized segmentation features."""
+
+    def __init__(self, centroids, mean, scale, labels, segments, segment_cards=SEGMENT_CARDS):
+        self.mean = np.asarray(mean, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.labels = np.asarray(labels)
+        self.centroids = (np.asarray(centroids, dtype=float) - self.mean) / self.scale
+        self._centroid_norms = (self.centroids ** 2).sum(axis=1)
+        self.segments = np.array(segments, dtype=object)
+        self.cards = np.array([segment_cards.get(segment) for segment in segments], dtype=object)
+
+    @classmethod
+    def from_rfm(cls, rfm_df, label_col="labels_rfm_clustering"):
+        """Centroids are the per-cluster feature means of the labelled RFM table."""
+        X = rfm_df[SEGMENT_FEATURES].to_numpy(dtype=float)
+        scale = X.std(axis=0)
+        means = rfm_df.groupby(label_col)[SEGMENT_FEATURES].mean()
+        names = name_segments(means.reset_index(), label_col=label_col)
+        return cls(means.to_numpy(), X.mean(axis=0), np.where(scale > 0, scale, 1.0), means.index.to_numpy(),
+                   [names[int(label)] for label in means.index])
+
+    def predict(self, profiles):
+        """Index of the nearest centroid for an (n, 7) array of profiles."""
+        Z = (np.atleast_2d(np.asarray(profiles, dtype=float)) - self.mean) / self.scale
+        # |z - c|^2 up to the |z|^2 term, which does not change the argmin
+        return (self._centroid_norms - 2 * Z @ self.centroids.T).argmin(axis=1)
+
+    def score(self, profiles):
+        """Cluster label, segment and card for every profile."""
+        nearest = self.predict(profiles)
+        return {
+            "label": self.labels[nearest].tolist(),
+            "segment": self.segments[nearest].tolist(),
+            "card": self.cards[nearest].tolist(),
+        }
+
+    def recommend(self, **profile):
+        """Single-profile fast path, keyword arguments are the segmentation features."""
+        nearest = int(self.predict([[profile[f] for f in SEGMENT_FEATURES]])[0])
+        return {"label": int(self.labels[nearest]), "segment": self.segments[nearest], "card": self.cards[nearest]}
+
+
+def get_recommender(path=cc_rfm_path):
+    """Recommender built once per version of cc_rfm.csv and shared by every session; None while it is missing."""
+    if not os.path.exists(path):
+        return None
+    key = ("recommender", path, *file_signature(path))
+    return shared(key, lambda: CardRecommender.from_rfm(load_rfm(path=path)))
+
+
+def parse_profiles(body):
+    """(n, 7) float array from a ``{"profiles": [{feature: number, ...}, ...]}`` request body.
+
+    Raises ValueError for anything that is not a non-empty list of profiles with
+    a finite number for every segmentation feature.
+    """
+    profiles = body.get("profiles") if isinstance(body, dict) else None
+    if not isinstance(profiles, list) or not profiles:
+        raise ValueError('expected {"profiles": [...]} with at least one profile')
+    rows = []
+    for i, profile in enumerate(profiles):
+        if not isinstance(profile, dict):
+            raise ValueError(f"profile {i} is not an object")
+        missing = [f for f in SEGMENT_FEATURES if f not in profile]
+        if missing:
+            raise ValueError(f"profile {i} is missing {', '.join(missing)}")
+        values = [profile[f] for f in SEGMENT_FEATURES]
+        # bool is an int subclass, but true/false is not a feature value
+        if not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            raise ValueError(f"profile {i} has a non-numeric value")
+        try:
+            rows.append([float(v) for v in values])
+        except OverflowError:
+            # a JSON integer with hundreds of digits
+            raise ValueError(f"profile {i} has a value too large for a float") from None
+    X = np.array(rows, dtype=float)
+    if not np.isfinite(X).all():
+        raise ValueError("profile values must be finite")
+    return X
+
+
+def _handler(recommender):
+    class ScoreHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != "/score":
+                self.send_error(404)
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                payload = json.dumps(recommender.score(parse_profiles(body))).encode()
+            except ValueError as e:
+                # json.JSONDecodeError is a ValueError too
+                self.send_error(400, str(e))
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ScoreHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve credit card recommendations over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args()
+
+    recommender = get_recommender()
+    if recommender is None:
+        raise SystemExit("No data file found. Please add cc_rfm.csv to the `data/` directory.")
+    server = ThreadingHTTPServer((args.host, args.port), _handler(recommender))
+    print(f"Serving recommendations on http://{args.host}:{args.port}/score")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
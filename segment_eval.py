@@ -0,0 +1,199 @@
+"""Choose the number of segments and check that they are stable.
+
+Sweep k, pick one and bootstrap it::
+
+    python segment_eval.py --k 2 3 4 5 6 --bootstrap 20 --jobs -1
+
+Every k is fitted on the standardized RFM features and scored by its inertia
+(for the elbow) and by the silhouette of a random sample of accounts, so the
+sweep stays O(sample^2) instead of O(n^2) at millions of accounts. The
+bootstrap refits the chosen k on resamples in a process pool and reports how
+many accounts keep their segment, overall and per cluster (Jaccard).
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_loader import cc_rfm_path, load_rfm
+from profiling import section
+from segmentation import SEGMENT_FEATURES, KMeans, _squared_distances, match_labels, models_dir, name_segments
+
+segment_eval_path = os.path.join(models_dir, "segment_eval.json")
+
+SILHOUETTE_SAMPLE = 10_000
+BOOTSTRAP_SAMPLE = 50_000
+# rows of the sample per distance block, keeps the block x sample matrix around 160 MB at most
+SILHOUETTE_CHUNK = 2048
+
+
+def sampled_silhouette(X, labels, sample_size=SILHOUETTE_SAMPLE, random_state=0):
+    """Mean silhouette coefficient over a random sample of the rows."""
+    X = np.asarray(X, dtype=float)
+    labels = np.asarray(labels, dtype=np.int64)
+    if len(X) > sample_size:
+        idx = np.random.default_rng(random_state).choice(len(X), sample_size, replace=False)
+        X, labels = X[idx], labels[idx]
+    k = int(labels.max()) + 1
+    counts = np.bincount(labels, minlength=k)
+    if (counts > 0).sum() < 2:
+        return float("nan")
+    onehot = np.zeros((len(X), k))
+    onehot[np.arange(len(X)), labels] = 1
+    scores = np.empty(len(X))
+    for start in range(0, len(X), SILHOUETTE_CHUNK):
+        own = labels[start:start + SILHOUETTE_CHUNK]
+        rows = np.arange(len(own))
+        # summed distance from every row of the block to every cluster
+        sums = np.sqrt(_squared_distances(X[start:start + SILHOUETTE_CHUNK], X)) @ onehot
+        own_count = counts[own] - 1
+        a = np.divide(sums[rows, own], own_count, out=np.zeros(len(own)), where=own_count > 0)
+        means = sums / np.maximum(counts, 1)
+        means[:, counts == 0] = np.inf
+        means[rows, own] = np.inf
+        b = means.min(axis=1)
+        s = np.divide(b - a, np.maximum(a, b), out=np.zeros(len(own)), where=np.maximum(a, b) > 0)
+        # a point alone in its cluster scores 0 by convention
+        s[own_count == 0] = 0
+        scores[start:start + SILHOUETTE_CHUNK] = s
+    return float(scores.mean())
+
+
+def elbow_k(ks, inertias):
+    """k furthest below the straight line between the first and last point of the inertia curve."""
+    ks = np.asarray(ks, dtype=float)
+    inertias = np.asarray(inertias, dtype=float)
+    if len(ks) < 3:
+        return int(ks[0])
+    # both axes scaled to 0-1 so the distance does not depend on the units
+    x = (ks - ks[0]) / (ks[-1] - ks[0])
+    y = (inertias - inertias.min()) / max(inertias.max() - inertias.min(), np.finfo(float).tiny)
+    chord = y[0] + (y[-1] - y[0]) * x
+    return int(ks[np.argmax(chord - y)])
+
+
+def sweep_k(X, ks, n_init=3, batch_size=None, n_jobs=1, sample_size=SILHOUETTE_SAMPLE, random_state=0):
+    """Inertia and sampled silhouette for every k, one row per k."""
+    X = np.asarray(X, dtype=float)
+    rng = np.random.default_rng(random_state)
+    # the same sample for every k so the silhouettes are comparable
+    sample = X[rng.choice(len(X), sample_size, replace=False)] if len(X) > sample_size else X
+    rows = []
+    for k in ks:
+        with section("segment_eval.sweep", rows=len(X)):
+            kmeans = KMeans(n_clusters=k, n_init=n_init, batch_size=batch_size, n_jobs=n_jobs,
+                            random_state=random_state).fit(X)
+            silhouette = sampled_silhouette(sample, kmeans.predict(sample), sample_size)
+        rows.append({"k": k, "inertia": float(kmeans.inertia_), "silhouette": silhouette})
+    return pd.DataFrame(rows)
+
+
+def choose_k(sweep, method="silhouette"):
+    """k with the best silhouette (the smallest one on ties), or the elbow of the inertia curve."""
+    if method == "elbow":
+        return elbow_k(sweep["k"], sweep["inertia"])
+    return int(sweep.sort_values(["silhouette", "k"], ascending=[False, True])["k"].iloc[0])
+
+
+def _bootstrap_once(X, reference, k, seed, n_init, batch_size):
+    rng = np.random.default_rng(seed)
+    kmeans = KMeans(n_clusters=k, n_init=n_init, batch_size=batch_size, random_state=seed)
+    kmeans.fit(X[rng.integers(0, len(X), len(X))])
+    labels = kmeans.predict(X)
+    labels = match_labels(labels, reference, k)[labels]
+    same = labels == reference
+    kept = np.bincount(reference[same], minlength=k)
+    union = np.bincount(reference, minlength=k) + np.bincount(labels, minlength=k) - kept
+    return float(same.mean()), kept / np.maximum(union, 1)
+
+
+def bootstrap_stability(X, k, n_boot=20, sample_size=BOOTSTRAP_SAMPLE, n_init=3, batch_size=None, n_jobs=1,
+                        random_state=0, reference=None):
+    """Agreement of n_boot refits on resampled accounts with the fit on all accounts.
+
+    The resamples are drawn from a sample of sample_size accounts, which is also
+    what each refit is compared on, so a bootstrap run costs the same at any n.
+    ``n_jobs`` runs the refits in a process pool (-1 for one worker per core).
+    "agreement" is the share of accounts in the same segment after matching the
+    cluster numbers, "jaccard" the per-cluster overlap with the reference members.
+    Pass the already fitted ``reference`` KMeans to skip the fit on all accounts.
+    Every fit gets at least 3 k-means++ restarts; with a single one the agreement
+    mostly measures unlucky seeds instead of the stability of the segments.
+    """
+    X = np.asarray(X, dtype=float)
+    rng = np.random.default_rng(random_state)
+    n_init = max(n_init, 3)
+    if reference is None:
+        reference = KMeans(n_clusters=k, n_init=n_init, batch_size=batch_size, random_state=random_state).fit(X)
+    sample = X[rng.choice(len(X), sample_size, replace=False)] if len(X) > sample_size else X
+    reference = reference.predict(sample)
+    seeds = np.random.SeedSequence(random_state).generate_state(n_boot)
+    params = [(sample, reference, k, int(seed), n_init, batch_size) for seed in seeds]
+    with section("segment_eval.bootstrap", rows=len(sample) * n_boot):
+        if n_jobs != 1 and n_boot > 1:
+            workers = None if n_jobs == -1 else n_jobs
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                runs = [f.result() for f in [executor.submit(_bootstrap_once, *p) for p in params]]
+        else:
+            runs = [_bootstrap_once(*p) for p in params]
+    agreement = np.array([run[0] for run in runs])
+    jaccard = np.array([run[1] for run in runs])
+    return {
+        "k": k,
+        "agreement_mean": float(agreement.mean()),
+        "agreement_min": float(agreement.min()),
+        "jaccard": jaccard.mean(axis=0).tolist(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pick the number of segments and check their stability.")
+    parser.add_argument("--rfm", default=cc_rfm_path, help="RFM table to evaluate")
+    parser.add_argument("--k", type=int, nargs="+", default=[2, 3, 4, 5, 6], help="cluster counts to sweep")
+    parser.add_argument("--select", choices=["silhouette", "elbow"], default="silhouette", help="how k is picked")
+    parser.add_argument("--n-init", type=int, default=3, help="k-means++ restarts per k and per bootstrap refit (at least 3 for the refits)")
+    parser.add_argument("--batch-size", type=int, default=None, help="use mini-batch K-Means with this batch size")
+    parser.add_argument("--sample", type=int, default=SILHOUETTE_SAMPLE, help="accounts in the silhouette sample")
+    parser.add_argument("--bootstrap", type=int, default=20, help="bootstrap refits of the chosen k, 0 to skip")
+    parser.add_argument("--jobs", type=int, default=1, help="processes for the restarts and refits, -1 for all cores")
+    parser.add_argument("--output", default=segment_eval_path, help="where the JSON report is written")
+    args = parser.parse_args()
+
+    rfm_df = load_rfm(path=args.rfm)
+    if rfm_df is None:
+        raise SystemExit(f"{args.rfm} not found")
+    X = rfm_df[SEGMENT_FEATURES].to_numpy(dtype=float)
+    scale = X.std(axis=0)
+    X = (X - X.mean(axis=0)) / np.where(scale > 0, scale, 1.0)
+
+    sweep = sweep_k(X, args.k, n_init=args.n_init, batch_size=args.batch_size, n_jobs=args.jobs,
+                    sample_size=args.sample)
+    k = choose_k(sweep, args.select)
+    print(sweep.to_string(index=False))
+    print(f"elbow at k={elbow_k(sweep['k'], sweep['inertia'])}, selected k={k} by {args.select}")
+
+    kmeans = KMeans(n_clusters=k, n_init=args.n_init, batch_size=args.batch_size, n_jobs=args.jobs).fit(X)
+    report = {"sweep": sweep.to_dict(orient="records"), "selected_k": k, "select": args.select}
+    if args.bootstrap:
+        report["stability"] = bootstrap_stability(X, k, n_boot=args.bootstrap, n_init=args.n_init,
+                                                  batch_size=args.batch_size, n_jobs=args.jobs, reference=kmeans)
+        print(f"bootstrap agreement {report['stability']['agreement_mean']:.1%} "
+              f"(worst run {report['stability']['agreement_min']:.1%})")
+
+    # names of the selected segmentation, matched on the cluster mean profiles
+    means = rfm_df[SEGMENT_FEATURES].groupby(kmeans.predict(X)).mean().rename_axis("labels_rfm_clustering").reset_index()
+    report["segments"] = {str(label): name for label, name in name_segments(means).items()}
+    for label, name in report["segments"].items():
+        print(f"  cluster {label}: {name}")
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,371 @@
+"""K-Means customer segmentation on the RFM features, in plain NumPy.
+
+Fit on the shipped RFM table and compare with the existing labels::
+
+    python segmentation.py --k 3 --features reference --warm-start
+
+Fold a new month's accounts into the saved centroids without a full refit::
+
+    python segmentation.py --update data/cc_rfm_new.csv
+"""
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from data_loader import cc_rfm_path, data_dir, load_rfm
+
+SEGMENT_FEATURES = ["recency", "frequency", "total_amt", "avg_spend", "tenure", "clv", "city_pop"]
+# the shipped labels_rfm_clustering were fit on every numeric column of cc_rfm.csv, the scores included;
+# standardized, those labels are a K-Means fixed point (inertia 371.86) while on SEGMENT_FEATURES they are not
+REFERENCE_FEATURES = SEGMENT_FEATURES + ["recency_score", "frequency_score", "monetary_score", "rfm_score",
+                                         "rfm_level", "population_group", "tenure_score"]
+
+# expected shape of each named segment, on cluster means scaled to 0-1 across the clusters with recency
+# inverted (1 = bought most recently), as described in the Results page "Cluster Analysis" table
+SEGMENT_PROFILES = {
+    "Luxury Essentials Enthusiast": {"recency": 1.0, "frequency": 1.0, "total_amt": 1.0, "avg_spend": 0.5,
+                                     "tenure": 1.0, "clv": 1.0, "city_pop": 0.0},
+    "Premium Shopper & Leisure Seeker": {"recency": 0.0, "frequency": 0.0, "total_amt": 0.0, "avg_spend": 1.0,
+                                         "tenure": 0.0, "clv": 0.0, "city_pop": 0.0},
+    "Smart Essentials Spender": {"recency": 0.5, "frequency": 0.5, "total_amt": 0.5, "avg_spend": 0.0,
+                                 "tenure": 0.5, "clv": 0.5, "city_pop": 1.0},
+}
+
+# "Cluster Analysis" table row of each segment, shown by the Results page and report.py
+SEGMENT_DESCRIPTIONS = {
+    "Smart Essentials Spender": {
+        "Recency": "Frequent purchases", "Frequency": "High transactions", "Total Amount Spent": "Moderate spend",
+        "Avg. Spending per Transaction": "Low spend per transaction", "Tenure": "Long tenure",
+        "Customer Lifetime Value": "Moderate CLV", "City Population": "Large cities",
+    },
+    "Luxury Essentials Enthusiast": {
+        "Recency": "Very frequent purchases", "Frequency": "Very high transactions", "Total Amount Spent": "High spend",
+        "Avg. Spending per Transaction": "Moderate spend per transaction", "Tenure": "Very long tenure",
+        "Customer Lifetime Value": "High CLV", "City Population": "Mid-sized cities",
+    },
+    "Premium Shopper & Leisure Seeker": {
+        "Recency": "Infrequent purchases", "Frequency": "Low transactions",
+        "Total Amount Spent": "Lower total, high per transaction",
+        "Avg. Spending per Transaction": "Very high spend per transaction", "Tenure": "Shorter tenure",
+        "Customer Lifetime Value": "Low CLV", "City Population": "Mid-sized cities",
+    },
+}
+
+models_dir = os.path.join(data_dir, "models")
+segmentation_model_path = os.path.join(models_dir, "segmentation.npz")
+
+# rows per distance block, keeps the n x k distance matrix small for millions of accounts
+ASSIGN_CHUNK_SIZE = 65536
+
+
+def _squared_distances(X, centers):
+    d = (X * X).sum(axis=1)[:, None] - 2 * X @ centers.T + (centers * centers).sum(axis=1)[None, :]
+    return np.maximum(d, 0)
+
+
+def assign(X, centers, chunk_size=ASSIGN_CHUNK_SIZE):
+    """Nearest center index and squared distance for every row of X."""
+    labels = np.empty(len(X), dtype=np.int64)
+    distances = np.empty(len(X))
+    for start in range(0, len(X), chunk_size):
+        d = _squared_distances(X[start:start + chunk_size], centers)
+        block = d.argmin(axis=1)
+        labels[start:start + chunk_size] = block
+        distances[start:start + chunk_size] = d[np.arange(len(block)), block]
+    return labels, distances
+
+
+def _cluster_sums(X, labels, k):
+    counts = np.bincount(labels, minlength=k)
+    sums = np.column_stack([np.bincount(labels, weights=X[:, j], minlength=k) for j in range(X.shape[1])])
+    return counts, sums
+
+
+def kmeans_plus_plus(X, k, rng):
+    """k-means++ seeding: each new center is drawn proportionally to its squared distance."""
+    n = len(X)
+    centers = np.empty((k, X.shape[1]))
+    centers[0] = X[rng.integers(n)]
+    closest = _squared_distances(X, centers[:1]).ravel()
+    for i in range(1, k):
+        cumulative = np.cumsum(closest)
+        if cumulative[-1] > 0:
+            idx = min(int(np.searchsorted(cumulative, rng.random() * cumulative[-1])), n - 1)
+        else:
+            idx = rng.integers(n)
+        centers[i] = X[idx]
+        closest = np.minimum(closest, _squared_distances(X, centers[i:i + 1]).ravel())
+    return centers
+
+
+def _lloyd(X, centers, max_iter, tol):
+    k = len(centers)
+    for _ in range(max_iter):
+        labels, distances = assign(X, centers)
+        counts, sums = _cluster_sums(X, labels, k)
+        new_centers = centers.copy()
+        filled = counts > 0
+        new_centers[filled] = sums[filled] / counts[filled, None]
+        # an empty cluster is re-seeded on the points furthest from their center
+        n_empty = int((~filled).sum())
+        if n_empty:
+            new_centers[~filled] = X[np.argsort(distances)[-n_empty:]]
+        shift = ((new_centers - centers) ** 2).sum()
+        centers = new_centers
+        if shift <= tol:
+            break
+    return centers
+
+
+def minibatch_step(batch, centers, counts):
+    """Fold one batch into the centers in place, each center being the running mean of its points."""
+    labels, _ = assign(batch, centers)
+    batch_counts, sums = _cluster_sums(batch, labels, len(centers))
+    counts += batch_counts
+    seen = batch_counts > 0
+    previous = centers[seen].copy()
+    centers[seen] += (sums[seen] - batch_counts[seen, None] * centers[seen]) / counts[seen, None]
+    return ((centers[seen] - previous) ** 2).sum()
+
+
+def _minibatch(X, centers, batch_size, max_iter, tol, rng):
+    counts = np.zeros(len(centers), dtype=np.int64)
+    for _ in range(max_iter):
+        batch = X[rng.integers(0, len(X), batch_size)]
+        if minibatch_step(batch, centers, counts) <= tol:
+            break
+    return centers
+
+
+def _fit_once(X, k, seed, max_iter, tol, batch_size):
+    rng = np.random.default_rng(seed)
+    if batch_size:
+        # seed on a sample so k-means++ stays cheap for millions of rows
+        sample = X[rng.choice(len(X), min(len(X), 10 * batch_size), replace=False)]
+        centers = _minibatch(X, kmeans_plus_plus(sample, k, rng), batch_size, max_iter, tol, rng)
+    else:
+        centers = _lloyd(X, kmeans_plus_plus(X, k, rng), max_iter, tol)
+    labels, distances = assign(X, centers)
+    return distances.sum(), centers, np.bincount(labels, minlength=k)
+
+
+class KMeans:
+    """K-Means with k-means++ seeding, optional mini-batch updates and parallel restarts.
+
+    ``batch_size`` switches to mini-batch mode, ``n_jobs`` runs the ``n_init``
+    restarts in a process pool (-1 for one worker per core). ``init`` gives the
+    starting centers of a single run instead of the k-means++ restarts.
+    """
+
+    def __init__(self, n_clusters=3, n_init=10, max_iter=300, tol=1e-4, batch_size=None, n_jobs=1, random_state=0,
+                 init=None):
+        self.n_clusters = n_clusters
+        self.n_init = n_init
+        self.max_iter = max_iter
+        self.tol = tol
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.init = init
+        self.cluster_centers_ = None
+        self.counts_ = None
+        self.inertia_ = None
+
+    def fit(self, X):
+        X = np.asarray(X, dtype=float)
+        # like scikit-learn, tol is relative to the mean feature variance
+        tol = self.tol * X.var(axis=0).mean()
+        if self.init is not None:
+            centers = _lloyd(X, np.array(self.init, dtype=float), self.max_iter, tol)
+            labels, distances = assign(X, centers)
+            self.inertia_, self.cluster_centers_ = distances.sum(), centers
+            self.counts_ = np.bincount(labels, minlength=self.n_clusters)
+            return self
+        seeds = np.random.SeedSequence(self.random_state).generate_state(self.n_init)
+        params = [(X, self.n_clusters, int(seed), self.max_iter, tol, self.batch_size) for seed in seeds]
+        if self.n_jobs != 1 and self.n_init > 1:
+            workers = None if self.n_jobs == -1 else self.n_jobs
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                runs = [f.result() for f in [executor.submit(_fit_once, *p) for p in params]]
+        else:
+            runs = [_fit_once(*p) for p in params]
+        self.inertia_, self.cluster_centers_, self.counts_ = min(runs, key=lambda run: run[0])
+        return self
+
+    def partial_fit(self, X, batch_size=1024):
+        """Update the fitted centers with new points instead of refitting from scratch."""
+        X = np.asarray(X, dtype=float)
+        if self.cluster_centers_ is None:
+            return self.fit(X)
+        for start in range(0, len(X), batch_size):
+            minibatch_step(X[start:start + batch_size], self.cluster_centers_, self.counts_)
+        return self
+
+    def predict(self, X):
+        return assign(np.asarray(X, dtype=float), self.cluster_centers_)[0]
+
+
+def _best_assignment(score):
+    """Permutation p maximizing the sum of score[i, p[i]] for a square score matrix."""
+    k = len(score)
+    if k <= 8:
+        best = max(itertools.permutations(range(k)), key=lambda p: score[np.arange(k), p].sum())
+        return np.array(best)
+    # greedy for large k, exhaustive search would be k!
+    mapping = np.full(k, -1)
+    for flat in np.argsort(score, axis=None)[::-1]:
+        i, j = divmod(int(flat), k)
+        if mapping[i] < 0 and j not in mapping:
+            mapping[i] = j
+    return mapping
+
+
+def match_labels(labels, reference, k):
+    """Permutation p maximizing the agreement of p[labels] with reference."""
+    contingency = np.zeros((k, k), dtype=np.int64)
+    np.add.at(contingency, (labels, reference), 1)
+    return _best_assignment(contingency)
+
+
+def profile_matrix(cluster_means, features=SEGMENT_FEATURES):
+    """Cluster means scaled to 0-1 per feature across the clusters, recency inverted."""
+    M = cluster_means[features].to_numpy(dtype=float)
+    spread = M.max(axis=0) - M.min(axis=0)
+    Z = (M - M.min(axis=0)) / np.where(spread > 0, spread, 1.0)
+    if "recency" in features:
+        Z[:, features.index("recency")] = 1 - Z[:, features.index("recency")]
+    return Z
+
+
+def name_segments(cluster_means, profiles=SEGMENT_PROFILES, label_col="labels_rfm_clustering"):
+    """Segment name per cluster label, matching the shape of the cluster means to SEGMENT_PROFILES.
+
+    The names follow the clusters when a refit renumbers them. Clusters left over
+    when k is larger than the number of profiles are called "Segment <label>".
+    """
+    labels = [int(label) for label in cluster_means[label_col]]
+    names = list(profiles)
+    Z = profile_matrix(cluster_means)
+    P = np.array([[profiles[name][f] for f in SEGMENT_FEATURES] for name in names])
+    cost = ((Z[:, None, :] - P[None, :, :]) ** 2).sum(axis=2)
+    # pad to square, a cluster assigned to a padding column keeps a generic name
+    n = max(len(labels), len(names))
+    score = np.zeros((n, n))
+    score[:len(labels), :len(names)] = -cost
+    mapping = _best_assignment(score)
+    return {label: names[mapping[i]] if mapping[i] < len(names) else f"Segment {label}"
+            for i, label in enumerate(labels)}
+
+
+class SegmentationModel:
+    """Standardization + K-Means on the RFM features, persistable as .npz."""
+
+    def __init__(self, features=SEGMENT_FEATURES, **kmeans_params):
+        self.features = list(features)
+        self.kmeans = KMeans(**kmeans_params)
+        self.mean_ = None
+        self.scale_ = None
+
+    def _standardize(self, rfm_df):
+        return (rfm_df[self.features].to_numpy(dtype=float) - self.mean_) / self.scale_
+
+    def fit(self, rfm_df, init_labels=None):
+        """Fit on rfm_df; ``init_labels`` starts from the centroids of an existing labelling instead of k-means++."""
+        X = rfm_df[self.features].to_numpy(dtype=float)
+        self.mean_ = X.mean(axis=0)
+        scale = X.std(axis=0)
+        self.scale_ = np.where(scale > 0, scale, 1.0)
+        Z = (X - self.mean_) / self.scale_
+        if init_labels is None:
+            self.kmeans.fit(Z)
+            return self
+        labels = np.asarray(init_labels)
+        init, self.kmeans.init = self.kmeans.init, np.array([Z[labels == c].mean(axis=0) for c in np.unique(labels)])
+        try:
+            self.kmeans.fit(Z)
+        finally:
+            self.kmeans.init = init
+        return self
+
+    def update(self, rfm_df):
+        """Incrementally fold new accounts into the centroids; the scaling stays fixed."""
+        self.kmeans.partial_fit(self._standardize(rfm_df))
+        return self
+
+    def predict(self, rfm_df):
+        return self.kmeans.predict(self._standardize(rfm_df))
+
+    @property
+    def centroids(self):
+        """Cluster centers in the original feature units."""
+        return self.kmeans.cluster_centers_ * self.scale_ + self.mean_
+
+    def align_to(self, rfm_df, reference_labels):
+        """Renumber the clusters so they agree with an existing labelling, returns the agreement."""
+        labels = self.predict(rfm_df)
+        reference = np.asarray(reference_labels, dtype=np.int64)
+        mapping = match_labels(labels, reference, self.kmeans.n_clusters)
+        order = np.argsort(mapping)
+        self.kmeans.cluster_centers_ = self.kmeans.cluster_centers_[order]
+        self.kmeans.counts_ = self.kmeans.counts_[order]
+        return float((mapping[labels] == reference).mean())
+
+    def save(self, path=segmentation_model_path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        np.savez(path, features=np.array(self.features), mean=self.mean_, scale=self.scale_,
+                 centers=self.kmeans.cluster_centers_, counts=self.kmeans.counts_,
+                 inertia=np.array(self.kmeans.inertia_ if self.kmeans.inertia_ is not None else np.nan))
+        return path
+
+    @classmethod
+    def load(cls, path=segmentation_model_path):
+        with np.load(path, allow_pickle=False) as saved:
+            model = cls(features=saved["features"].tolist(), n_clusters=len(saved["centers"]))
+            model.mean_ = saved["mean"]
+            model.scale_ = saved["scale"]
+            model.kmeans.cluster_centers_ = saved["centers"]
+            model.kmeans.counts_ = saved["counts"]
+            model.kmeans.inertia_ = float(saved["inertia"])
+        return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit or update the K-Means customer segmentation.")
+    parser.add_argument("--rfm", default=cc_rfm_path, help="RFM table to fit on")
+    parser.add_argument("--model", default=segmentation_model_path, help="where the centroids are stored")
+    parser.add_argument("--k", type=int, default=3, help="number of clusters")
+    parser.add_argument("--features", choices=["segment", "reference"], default="segment",
+                        help="SEGMENT_FEATURES, or REFERENCE_FEATURES that the shipped labels were fit on")
+    parser.add_argument("--warm-start", action="store_true",
+                        help="start from the centroids of labels_rfm_clustering instead of k-means++")
+    parser.add_argument("--n-init", type=int, default=10, help="number of k-means++ restarts")
+    parser.add_argument("--batch-size", type=int, default=None, help="use mini-batch K-Means with this batch size")
+    parser.add_argument("--jobs", type=int, default=1, help="processes for the restarts, -1 for all cores")
+    parser.add_argument("--update", metavar="CSV", help="fold this RFM table into the saved model instead of refitting")
+    args = parser.parse_args()
+
+    if args.update:
+        model = SegmentationModel.load(args.model)
+        model.update(load_rfm(path=args.update))
+        print(model.save(args.model))
+        return
+
+    rfm_df = load_rfm(path=args.rfm)
+    features = REFERENCE_FEATURES if args.features == "reference" else SEGMENT_FEATURES
+    model = SegmentationModel(features, n_clusters=args.k, n_init=args.n_init, batch_size=args.batch_size,
+                              n_jobs=args.jobs)
+    labelled = "labels_rfm_clustering" in rfm_df and rfm_df["labels_rfm_clustering"].nunique() == args.k
+    if args.warm_start and not labelled:
+        raise SystemExit(f"--warm-start needs a labels_rfm_clustering column with {args.k} clusters")
+    model.fit(rfm_df, init_labels=rfm_df["labels_rfm_clustering"] if args.warm_start else None)
+    if labelled:
+        agreement = model.align_to(rfm_df, rfm_df["labels_rfm_clustering"])
+        print(f"agreement with labels_rfm_clustering: {agreement:.1%}, cluster sizes {model.kmeans.counts_.tolist()}")
+    print(model.save(args.model))
+
+
+if __name__ == "__main__":
+    main()
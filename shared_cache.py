@@ -0,0 +1,104 @@
+"""Process-wide, read-only cache of the datasets shared by every Streamlit session.
+
+``st.cache_data`` hands each caller its own copy of a DataFrame, so memory grows
+with the number of concurrent sessions. Here every session gets the same
+object; pandas Copy-on-Write makes any modification copy instead of changing
+the shared frame. Entries are evicted least-recently-used once the total size
+goes over the budget (``APP_CACHE_BUDGET_MB``, default 1024).
+"""
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# a session that modifies a cached frame gets a private copy instead of changing everyone's data;
+# always the case from pandas 3 on, where the option is deprecated
+if int(pd.__version__.split(".")[0]) < 3:
+    pd.set_option("mode.copy_on_write", True)
+
+DEFAULT_BUDGET_MB = 1024
+
+
+def size_of(value):
+    """Approximate bytes held by a cached value."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sum(size_of(v) for v in value.values()) + sys.getsizeof(value)
+    if isinstance(value, (list, tuple)):
+        return sum(size_of(v) for v in value) + sys.getsizeof(value)
+    return sys.getsizeof(value)
+
+
+class SharedCache:
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+        self._loading = {}  # key -> lock, so concurrent sessions load a key only once
+        self.bytes = 0
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, key, loader):
+        """Cached value for key, calling loader() once on a miss."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            key_lock = self._loading.setdefault(key, threading.Lock())
+        with key_lock:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key][0]
+            try:
+                value = loader()
+            except BaseException:
+                # the sessions waiting on key_lock try the loader again themselves
+                with self._lock:
+                    self._loading.pop(key, None)
+                raise
+            with self._lock:
+                self.misses += 1
+                self._put(key, value)
+                self._loading.pop(key, None)
+            return value
+
+    def _put(self, key, value):
+        size = size_of(value)
+        self._entries[key] = (value, size)
+        self.bytes += size
+        # never evict the entry that was just added, even if it alone is over budget
+        while self.bytes > self.budget_bytes and len(self._entries) > 1:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.bytes -= evicted
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self.bytes, "budget_bytes": self.budget_bytes,
+                    "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+
+cache = SharedCache(int(float(os.environ.get("APP_CACHE_BUDGET_MB", DEFAULT_BUDGET_MB)) * 2**20))
+
+
+def shared(key, loader):
+    """Shorthand for ``cache.get`` on the process-wide cache."""
+    return cache.get(key, loader)
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# the modules live at the repository root and are imported by name, like app.py does
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="session")
+def frames(tmp_path_factory):
+    """Synthetic transactions, their RFM table with three made-up clusters and their demographics."""
+    from benchmarks.synthetic import write_transactions
+    from data_loader import _read_cc_clean_csv
+    from demographics import compute_demographics
+    from rfm_builder import build_rfm
+
+    path = str(tmp_path_factory.mktemp("frames") / "cc_clean.csv")
+    df = _read_cc_clean_csv(write_transactions(path, 5000, seed=0))
+    rfm_df = build_rfm([path])
+    rfm_df["labels_rfm_clustering"] = rfm_df["acct_num"] % 3
+    return df, rfm_df, compute_demographics(df)
@@ -0,0 +1,62 @@
+import glob
+import os
+import threading
+
+import pytest
+
+import aggregates
+import data_loader
+from benchmarks.synthetic import write_transactions
+from rfm_builder import build_rfm
+from shared_cache import cache
+
+
+@pytest.fixture
+def sources(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_loader, "cache_dir", str(tmp_path / "cache"))
+    monkeypatch.setattr(aggregates, "aggregates_dir", str(tmp_path / "aggregates"))
+    monkeypatch.setattr(aggregates, "manifest_path", str(tmp_path / "aggregates" / "manifest.json"))
+    cache.clear()
+    csv_path = write_transactions(str(tmp_path / "cc_clean.csv"), 2000, seed=0)
+    rfm_path = str(tmp_path / "cc_rfm.csv")
+    rfm_df = build_rfm([csv_path])
+    rfm_df["labels_rfm_clustering"] = rfm_df["acct_num"] % 3
+    rfm_df.to_csv(rfm_path, index=False)
+    yield [csv_path, rfm_path]
+    cache.clear()
+
+
+def artifacts():
+    return glob.glob(os.path.join(aggregates.aggregates_dir, "*"))
+
+
+def test_concurrent_first_views_build_once(sources):
+    results, errors = [], []
+
+    def view():
+        try:
+            results.append(aggregates.load_aggregates(sources))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=view) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert all(r is results[0] for r in results)
+    assert sorted(artifacts()) == sorted([os.path.join(aggregates.aggregates_dir, aggregates._read_manifest()
+                                                       [aggregates.source_fingerprint(sources)]['path']),
+                                          aggregates.manifest_path])
+
+
+def test_replaced_source_drops_the_old_artifact(sources):
+    first = aggregates.build_aggregates(sources)
+    rfm_df = data_loader.load_rfm(path=sources[1]).copy()
+    rfm_df["labels_rfm_clustering"] = rfm_df["acct_num"] % 2
+    rfm_df.to_csv(sources[1], index=False)
+    second = aggregates.build_aggregates(sources)
+    assert second != first
+    assert sorted(artifacts()) == sorted([second, aggregates.manifest_path])
+    assert len(aggregates._read_manifest()) == 1
@@ -0,0 +1,44 @@
+import os
+
+import pandas as pd
+import pytest
+
+import data_loader
+from shared_cache import cache
+
+
+@pytest.fixture(autouse=True)
+def scratch_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(data_loader, "cache_dir", str(tmp_path / "cache"))
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def write_rfm(directory, accounts):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "cc_rfm.csv")
+    pd.DataFrame({"acct_num": [float(a) for a in accounts], "job_type": "x", "shop_category": "y",
+                  "labels_rfm_clustering": 0}).to_csv(path, index=False)
+    return path
+
+
+def test_same_basename_does_not_share_parquet_cache(tmp_path):
+    shipped = write_rfm(tmp_path / "data", range(88))
+    other = write_rfm(tmp_path / "other", range(199))
+    assert len(data_loader.load_rfm(path=shipped)) == 88
+    assert len(data_loader.load_rfm(path=other)) == 199
+    cache.clear()
+    assert len(data_loader.load_rfm(path=shipped)) == 88
+    assert data_loader.load_rfm(path=shipped)["acct_num"].dtype == "int64"
+
+
+def test_rewritten_csv_is_reconverted(tmp_path):
+    path = write_rfm(tmp_path / "data", range(10))
+    assert len(data_loader.load_rfm(path=path)) == 10
+    write_rfm(tmp_path / "data", range(12))
+    cache.clear()
+    assert len(data_loader.load_rfm(path=path)) == 12
+    if data_loader.HAS_PARQUET:
+        # the copy of the old version is removed
+        assert os.listdir(data_loader.cache_dir) == [os.path.basename(data_loader.parquet_path(path))]
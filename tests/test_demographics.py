@@ -0,0 +1,20 @@
+import pandas as pd
+
+from demographics import compute_demographics
+
+
+def test_missing_dob_does_not_replace_a_known_one():
+    df = pd.DataFrame({'acct_num': [1, 1, 2], 'dob': pd.to_datetime(['1950-01-01', None, None])})
+    out = compute_demographics(df).set_index('acct_num')
+    assert out.loc[1, 'yob'] == 1950
+    assert out.loc[1, 'age'] == 72
+    assert out.loc[1, 'generation'] == 'Baby Boomer'
+    # an account without any dob stays unknown
+    assert pd.isna(out.loc[2, 'age'])
+
+
+def test_conflicting_dobs_keep_the_latest():
+    df = pd.DataFrame({'acct_num': [1, 1], 'dob': ['01/01/1950', '01/01/1970']})
+    out = compute_demographics(df)
+    assert out['yob'].tolist() == [1970]
+    assert out['generation'].tolist() == ['Gen X']
@@ -0,0 +1,18 @@
+import os
+
+import pytest
+
+import media
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def test_resized_copy_is_written_whole(tmp_path, monkeypatch):
+    monkeypatch.setattr(media, "image_cache_dir", str(tmp_path / ".cache"))
+    src = str(tmp_path / "logo.png")
+    Image.new("RGBA", (400, 200), (255, 0, 0, 128)).save(src)
+    out = media.resized_image(src, 100)
+    assert os.listdir(media.image_cache_dir) == [os.path.basename(out)]
+    with Image.open(out) as img:
+        assert img.size == (100, 50)
+    assert media.resized_image(src, 100) == out
@@ -0,0 +1,120 @@
+import os
+
+import pandas as pd
+import pytest
+
+import aggregates
+import data_loader
+import partitions
+from benchmarks.synthetic import generate_transactions
+from query import Filters, load_index
+from rfm_builder import build_rfm
+from shared_cache import cache
+
+
+@pytest.fixture(autouse=True)
+def scratch_cache(tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    monkeypatch.setattr(data_loader, "cache_dir", str(cache_dir))
+    monkeypatch.setattr(partitions, "partition_cache_dir", str(cache_dir / "partitions"))
+    monkeypatch.setattr(partitions, "manifest_path", str(cache_dir / "partitions" / "manifest.json"))
+    monkeypatch.setattr(aggregates, "aggregates_dir", str(tmp_path / "aggregates"))
+    monkeypatch.setattr(aggregates, "manifest_path", str(tmp_path / "aggregates" / "manifest.json"))
+    cache.clear()
+    yield
+    cache.clear()
+
+
+@pytest.fixture
+def months(tmp_path, monkeypatch):
+    df = pd.concat(generate_transactions(3000, seed=0))
+    month = pd.to_datetime(df["trans_datetime"]).dt.strftime("%Y-%m")
+    directory = tmp_path / "partitions"
+    directory.mkdir()
+    # a single month is still read as a partition, not as a cc_clean.csv
+    monkeypatch.setattr(partitions, "partitions_dir", str(directory))
+    paths = []
+    for name, part in df.groupby(month):
+        paths.append(str(directory / f"cc_clean-{name}.csv"))
+        part.to_csv(paths[-1], index=False)
+    return paths
+
+
+def write_rfm(paths, tmp_path):
+    rfm_df = build_rfm(paths)
+    rfm_df["labels_rfm_clustering"] = rfm_df["acct_num"] % 3
+    path = str(tmp_path / "cc_rfm.csv")
+    rfm_df.to_csv(path, index=False)
+    return path
+
+
+def test_same_file_name_does_not_share_parquet_cache(tmp_path, months):
+    other_dir = tmp_path / "other"
+    other_dir.mkdir()
+    other = str(other_dir / os.path.basename(months[0]))
+    pd.read_csv(months[1]).to_csv(other, index=False)
+    entries, _ = partitions.ingest([months[0], other], workers=1)
+    assert entries[months[0]]["parquet"] != entries[other]["parquet"]
+    assert entries[months[0]]["accounts"] != entries[other]["accounts"]
+    assert len(pd.read_parquet(entries[other]["parquet"])) == len(pd.read_csv(months[1]))
+
+
+def test_new_month_only_reads_the_new_partition(tmp_path, months, monkeypatch):
+    rfm_path = write_rfm(months, tmp_path)
+    first = aggregates.build_aggregates(months[:-1] + [rfm_path])
+
+    read = []
+    read_partition = partitions._read_partition
+    monkeypatch.setattr(partitions, "_read_partition", lambda path, columns=None: read.append(path) or
+                        read_partition(path, columns))
+    second = aggregates.build_aggregates(months + [rfm_path])
+    assert read == [months[-1]]
+    assert second != first
+
+    aggs = aggregates._read_artifact(second)
+    full = pd.concat([pd.read_csv(p) for p in months])
+    assert aggs["category_counts"]["count"].sum() == len(full)
+    assert aggs["generation_counts"]["account_count"].sum() == full["acct_num"].nunique()
+
+
+def test_date_range_read_skips_partitions_outside_it(tmp_path, months, monkeypatch):
+    entries, _ = partitions.ingest(months, workers=1)
+    read = []
+    read_partition = partitions._read_partition
+    monkeypatch.setattr(partitions, "_read_partition", lambda path, columns=None: read.append(path) or
+                        read_partition(path, columns))
+    start, end = pd.Timestamp(entries[months[3]]["min_date"]), pd.Timestamp(entries[months[3]]["max_date"])
+    df = partitions.load_transaction_files(months, ["amt"], start=start, end=end)
+    assert read == [entries[months[3]]["parquet"]]
+    expected = pd.read_csv(months[3])
+    assert len(df) == len(expected)
+    assert df["amt"].sum() == pytest.approx(expected["amt"].sum())
+
+
+def test_edges_of_the_range_are_inclusive():
+    df = pd.DataFrame({"trans_datetime": pd.to_datetime(["2021-01-31 23:59", "2021-02-01 00:00", "2021-02-28 23:59",
+                                                         "2021-03-01 00:00"])})
+    assert len(partitions._in_range(df, pd.Timestamp("2021-02-01"), pd.Timestamp("2021-02-28"))) == 2
+    entry = {"min_date": "2021-02-01", "max_date": "2021-02-28"}
+    assert partitions._overlaps(entry, None, "2021-02-01")
+    assert partitions._overlaps(entry, "2021-02-28", None)
+    assert not partitions._overlaps(entry, "2021-03-01", None)
+    assert not partitions._overlaps({"min_date": None, "max_date": None}, None, None)
+
+
+def test_filtered_index_only_reads_partitions_in_range(tmp_path, months, monkeypatch):
+    paths = months + [write_rfm(months, tmp_path)]
+    entries, _ = partitions.ingest(months, workers=1)
+    start, end = pd.Timestamp(entries[months[3]]["min_date"]).date(), pd.Timestamp(entries[months[3]]["max_date"]).date()
+    filters = Filters(start=start, end=end)
+    full = load_index(paths).aggregate(filters)
+
+    cache.clear()
+    read = []
+    read_partition = partitions._read_partition
+    monkeypatch.setattr(partitions, "_read_partition", lambda path, columns=None: read.append(path) or
+                        read_partition(path, columns))
+    pruned = load_index(paths, start, end).aggregate(filters)
+    assert read == [entries[months[3]]["parquet"]]
+    assert pruned["transaction_count"] == full["transaction_count"] == len(pd.read_csv(months[3]))
+    pd.testing.assert_frame_equal(pruned["category_counts"], full["category_counts"], check_categorical=False)
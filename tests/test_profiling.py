@@ -0,0 +1,61 @@
+import importlib
+import threading
+import tracemalloc
+
+import profiling
+
+
+def _reload(monkeypatch, **env):
+    for name in ("APP_PROFILE", "APP_PROFILE_MEMORY"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return importlib.reload(profiling)
+
+
+def test_debug_switch_needs_app_profile(monkeypatch):
+    module = _reload(monkeypatch)
+    assert not module.enable(True)
+    assert module.section("x") is module._NOOP
+
+
+def test_enable_only_affects_the_current_run(monkeypatch):
+    module = _reload(monkeypatch, APP_PROFILE="1")
+    module.reset()
+    module.enable(False)
+    seen = []
+
+    def other_session():
+        module.enable(True)
+        with module.section("other"):
+            pass
+        seen.append(module.is_enabled())
+
+    thread = threading.Thread(target=other_session)
+    thread.start()
+    thread.join()
+    with module.section("mine"):
+        pass
+    assert seen == [True]
+    assert not module.is_enabled()
+    assert list(module.snapshot()) == ["other"]
+
+
+def test_memory_is_only_traced_when_configured(monkeypatch):
+    was_tracing = tracemalloc.is_tracing()
+    module = _reload(monkeypatch, APP_PROFILE="1")
+    module.reset()
+    with module.section("timed"):
+        pass
+    assert tracemalloc.is_tracing() == was_tracing
+    assert "peak_bytes" not in module.to_prometheus()
+
+    module = _reload(monkeypatch, APP_PROFILE="1", APP_PROFILE_MEMORY="1")
+    module.reset()
+    with module.section("traced"):
+        data = [0] * 100_000
+    assert module.snapshot()["traced"]["peak_bytes_max"] > 0
+    del data
+    if not was_tracing:
+        tracemalloc.stop()
+    _reload(monkeypatch)
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from aggregates import CLUSTER_METRICS, compute_aggregates, normalize_cluster_means
+from demographics import GENERATION_LABELS
+from query import POPULATION_BAND_LABELS, Filters, TransactionIndex
+
+
+def assert_same_rollups(got, expected):
+    assert got['account_count'] == expected['account_count']
+    assert got['age_stats'] == expected['age_stats']
+    for key in ('generation_counts', 'category_counts', 'category_amounts', 'cluster_means', 'cluster_means_long'):
+        pd.testing.assert_frame_equal(got[key].reset_index(drop=True), expected[key].reset_index(drop=True),
+                                      check_dtype=False, check_categorical=False, obj=key)
+    pd.testing.assert_frame_equal(got['monthly'].reset_index(drop=True),
+                                  expected['monthly'][got['monthly'].columns].reset_index(drop=True),
+                                  check_dtype=False, obj='monthly')
+
+
+def test_aggregate_with_every_value_matches_compute_aggregates(frames):
+    df, rfm_df, demographics = frames
+    index = TransactionIndex(df, rfm_df, demographics)
+    everything = Filters(start=index.date_range[0], end=index.date_range[1],
+                         generations=tuple(GENERATION_LABELS), job_types=tuple(index.job_types),
+                         categories=tuple(index.categories), clusters=tuple(index.clusters),
+                         population_bands=tuple(POPULATION_BAND_LABELS))
+    got = index.aggregate(everything)
+    assert got['transaction_count'] == len(df)
+    assert_same_rollups(got, compute_aggregates(df, rfm_df, demographics))
+
+
+def test_missing_category_is_left_out_of_the_category_rollups(frames):
+    df, rfm_df, demographics = frames
+    df = df.copy()
+    df.loc[0, 'category_group'] = np.nan
+    index = TransactionIndex(df, rfm_df, demographics)
+    assert_same_rollups(index.aggregate(Filters()), compute_aggregates(df, rfm_df, demographics))
+    # picking categories drops the transaction, like isin() would
+    assert index.aggregate(Filters(categories=tuple(index.categories)))['transaction_count'] == len(df) - 1
+
+
+def test_normalize_single_cluster_has_no_nan():
+    means = pd.DataFrame([[0] + [1.0] * len(CLUSTER_METRICS)], columns=['labels_rfm_clustering'] + CLUSTER_METRICS)
+    assert not normalize_cluster_means(means)['normalized_mean'].isna().any()
@@ -0,0 +1,20 @@
+import os
+
+import report
+from aggregates import compute_aggregates
+from segmentation import SEGMENT_DESCRIPTIONS
+
+
+def test_report_without_vl_convert_creates_the_output_directory(frames, tmp_path, monkeypatch):
+    aggs = compute_aggregates(*frames)
+    monkeypatch.setattr(report, "HAS_VL_CONVERT", False)
+    monkeypatch.setattr(report, "report_aggregates", lambda filters: aggs)
+    out_dir = str(tmp_path / "fresh" / "plots")
+    written = report.build_report(out_dir=out_dir)
+    assert written == [os.path.join(out_dir, "report.html")]
+    with open(written[0]) as f:
+        page = f.read()
+    assert "vegaEmbed" in page
+    for name in aggs['segment_names'].values():
+        if name in SEGMENT_DESCRIPTIONS:
+            assert SEGMENT_DESCRIPTIONS[name]['Tenure'] in page
@@ -0,0 +1,59 @@
+import os
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import generate_transactions
+from rfm_builder import add_scores, build_rfm
+from segmentation import REFERENCE_FEATURES
+
+RFM_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cc_rfm.csv")
+SCORE_COLUMNS = ["recency_score", "frequency_score", "monetary_score", "rfm_score", "rfm_level", "tenure_score",
+                 "population_group"]
+
+
+@pytest.fixture
+def split_files(tmp_path):
+    # shuffled, so the second file has rows older than the newest row of the first
+    df = pd.concat(generate_transactions(5000, seed=0)).sample(frac=1, random_state=0)
+    first, second = tmp_path / "a.csv", tmp_path / "b.csv"
+    df.iloc[:3000].to_csv(first, index=False)
+    df.iloc[3000:].to_csv(second, index=False)
+    return df, str(first), str(second)
+
+
+def test_incremental_keeps_back_dated_rows(split_files, tmp_path):
+    df, first, second = split_files
+    state = str(tmp_path / "state.npz")
+    build_rfm([first], chunk_size=1000, state_path=state)
+    rfm_df = build_rfm([first, second], chunk_size=1000, state_path=state)
+    assert rfm_df["frequency"].sum() == len(df)
+    assert rfm_df.attrs["skipped_files"] == [first]
+    full = build_rfm([first, second], chunk_size=1000).set_index("acct_num")
+    pd.testing.assert_frame_equal(rfm_df.set_index("acct_num").sort_index(), full.sort_index())
+
+
+def test_changed_file_is_refused(split_files, tmp_path):
+    _, first, second = split_files
+    state = str(tmp_path / "state.npz")
+    build_rfm([first], chunk_size=1000, state_path=state)
+    with open(first, "a") as f:
+        f.write(open(second).read().split("\n", 1)[1])
+    with pytest.raises(ValueError, match="changed"):
+        build_rfm([first], chunk_size=1000, state_path=state)
+
+
+def test_rescoring_the_shipped_table_reproduces_its_scores():
+    if not os.path.exists(RFM_PATH):
+        pytest.skip("data/cc_rfm.csv not present")
+    shipped = pd.read_csv(RFM_PATH)
+    rescored = add_scores(shipped.drop(columns=SCORE_COLUMNS))
+    pd.testing.assert_frame_equal(rescored[SCORE_COLUMNS], shipped[SCORE_COLUMNS], check_dtype=False)
+
+
+def test_built_table_has_the_reference_features(split_files):
+    _, first, second = split_files
+    rfm_df = build_rfm([first, second])
+    assert not rfm_df[REFERENCE_FEATURES].isna().any().any()
+    # equal recencies always get the same score
+    assert (rfm_df.groupby("recency")["recency_score"].nunique() == 1).all()
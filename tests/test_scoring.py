@@ -0,0 +1,81 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from scoring import CardRecommender, _handler, get_recommender, parse_profiles
+from segmentation import SEGMENT_FEATURES
+
+PROFILE = dict(zip(SEGMENT_FEATURES, [20, 900, 60000, 70, 730, 80, 300000]))
+
+
+@pytest.fixture(scope="module")
+def server():
+    rfm_df = pd.DataFrame({f: [1.0, 10.0, 100.0] for f in SEGMENT_FEATURES})
+    rfm_df["labels_rfm_clustering"] = [0, 1, 2]
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _handler(CardRecommender.from_rfm(rfm_df)))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/score"
+    httpd.shutdown()
+
+
+def post(url, body):
+    request = urllib.request.Request(url, data=body.encode(), method="POST")
+    try:
+        with urllib.request.urlopen(request) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, None
+
+
+def test_parse_profiles_orders_features():
+    assert parse_profiles({"profiles": [PROFILE]}).tolist() == [[PROFILE[f] for f in SEGMENT_FEATURES]]
+
+
+@pytest.mark.parametrize("body", [
+    {"profiles": []},
+    {"profiles": [{**PROFILE, "recency": "soon"}]},
+    {"profiles": [{**PROFILE, "clv": True}]},
+    {"profiles": [{k: v for k, v in PROFILE.items() if k != "tenure"}]},
+    {"profiles": [PROFILE, 3]},
+    {"profiles": {"recency": 1}},
+    [PROFILE],
+])
+def test_parse_profiles_rejects_bad_input(body):
+    with pytest.raises(ValueError):
+        parse_profiles(body)
+
+
+HUGE = json.dumps({"profiles": [PROFILE]}).replace('"recency": 20', '"recency": 1' + '0' * 400)
+
+
+def test_bad_requests_get_400(server):
+    for body in ['{"profiles": []}', '{"profiles": [{"recency": "x"}]}', 'not json', '[]', HUGE]:
+        assert post(server, body)[0] == 400
+
+
+def test_scores_profiles(server):
+    status, payload = post(server, json.dumps({"profiles": [PROFILE, PROFILE]}))
+    assert status == 200
+    assert len(payload["card"]) == 2
+    assert np.unique(payload["label"]).size == 1
+
+
+def test_recommender_follows_the_rfm_file(tmp_path, monkeypatch):
+    monkeypatch.setattr("data_loader.cache_dir", str(tmp_path / "cache"))
+    path = str(tmp_path / "cc_rfm.csv")
+    assert get_recommender(path) is None
+    rfm_df = pd.DataFrame({f: [1.0, 10.0, 100.0] for f in SEGMENT_FEATURES})
+    rfm_df["labels_rfm_clustering"] = [0, 1, 2]
+    rfm_df.to_csv(path, index=False)
+    first = get_recommender(path)
+    assert first is get_recommender(path)
+    # a different size too, so the signature changes even with a coarse mtime
+    rfm_df["labels_rfm_clustering"] = [0, 0, 11]
+    rfm_df.to_csv(path, index=False)
+    assert len(get_recommender(path).labels) == 2
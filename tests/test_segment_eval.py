@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+from segment_eval import bootstrap_stability, choose_k, elbow_k, sampled_silhouette, sweep_k
+
+
+def blobs(k, n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    # evenly spaced on a circle, so no two blobs are close enough to pass for one
+    angles = 2 * np.pi * np.arange(k) / k
+    centers = 10 * np.column_stack([np.cos(angles), np.sin(angles)])
+    X = np.concatenate([rng.normal(c, 0.3, size=(n, 2)) for c in centers])
+    return X, np.repeat(np.arange(k), n)
+
+
+def exact_silhouette(X, labels):
+    D = np.sqrt(((X[:, None, :] - X[None, :, :]) ** 2).sum(axis=2))
+    scores = []
+    for i in range(len(X)):
+        own = labels == labels[i]
+        if own.sum() == 1:
+            scores.append(0.0)
+            continue
+        a = D[i, own].sum() / (own.sum() - 1)
+        b = min(D[i, labels == other].mean() for other in np.unique(labels) if other != labels[i])
+        scores.append((b - a) / max(a, b))
+    return float(np.mean(scores))
+
+
+def test_sampled_silhouette_is_exact_without_sampling():
+    rng = np.random.default_rng(1)
+    X = rng.normal(size=(90, 3))
+    labels = rng.integers(0, 3, 90)
+    labels[0] = 3  # a cluster of one scores 0
+    assert sampled_silhouette(X, labels, sample_size=1000) == pytest.approx(exact_silhouette(X, labels))
+
+
+def test_elbow_and_silhouette_pick_the_number_of_blobs():
+    X, _ = blobs(4)
+    sweep = sweep_k(X, [2, 3, 4, 5, 6, 7], n_init=3)
+    assert choose_k(sweep) == 4
+    assert choose_k(sweep, "elbow") == 4
+    assert elbow_k([1, 2, 3, 4, 5], [100, 20, 15, 12, 10]) == 2
+
+
+def test_separated_clusters_are_perfectly_stable():
+    # well separated, but a single k-means++ seed often puts two centers on the far blob
+    rng = np.random.default_rng(0)
+    X = np.concatenate([rng.normal(c, 0.3, size=(60, 2)) for c in [(0, 0), (5, 0), (100, 0)]])
+    stability = bootstrap_stability(X, 3, n_boot=20, n_init=1)
+    assert stability["agreement_min"] == 1.0
+    assert stability["jaccard"] == [1.0, 1.0, 1.0]
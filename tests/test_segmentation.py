@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from segmentation import (REFERENCE_FEATURES, SEGMENT_FEATURES, KMeans, SegmentationModel, match_labels,
+                          name_segments)
+
+RFM_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cc_rfm.csv")
+
+
+@pytest.fixture(scope="module")
+def rfm():
+    if not os.path.exists(RFM_PATH):
+        pytest.skip("data/cc_rfm.csv not present")
+    return pd.read_csv(RFM_PATH)
+
+
+def blobs(rng, centers, n=50):
+    X = np.concatenate([rng.normal(c, 0.1, size=(n, len(c))) for c in centers])
+    return X, np.repeat(np.arange(len(centers)), n)
+
+
+def test_match_labels_finds_the_permutation():
+    reference = np.array([0, 0, 1, 1, 2, 2, 2])
+    labels = np.array([2, 2, 0, 0, 1, 1, 0])
+    mapping = match_labels(labels, reference, 3)
+    assert mapping.tolist() == [1, 2, 0]
+    assert (mapping[labels] == reference).sum() == 6
+
+
+def test_kmeans_recovers_separated_blobs():
+    X, truth = blobs(np.random.default_rng(0), [[0, 0], [5, 5], [0, 5]])
+    labels = KMeans(n_clusters=3, n_init=3).fit(X).predict(X)
+    assert (match_labels(labels, truth, 3)[labels] == truth).all()
+
+
+def test_partial_fit_moves_centers_towards_new_points():
+    rng = np.random.default_rng(1)
+    X, _ = blobs(rng, [[0, 0], [5, 5]])
+    kmeans = KMeans(n_clusters=2, n_init=2).fit(X)
+    before = kmeans.cluster_centers_.copy()
+    shifted, _ = blobs(rng, [[1, 1]], n=500)
+    kmeans.partial_fit(shifted)
+    moved = np.abs(kmeans.cluster_centers_ - before).sum(axis=1)
+    near = np.argmin(((before - [0, 0]) ** 2).sum(axis=1))
+    assert moved[near] > 0.5
+    assert moved[1 - near] == 0
+    assert kmeans.counts_.sum() == len(X) + len(shifted)
+
+
+def test_align_to_renumbers_the_centroids(rfm):
+    model = SegmentationModel(REFERENCE_FEATURES, n_clusters=3, n_init=10).fit(rfm)
+    agreement = model.align_to(rfm, rfm["labels_rfm_clustering"])
+    # k-means++ finds a slightly lower inertia solution that differs from the shipped labels by one account
+    assert agreement > 0.98
+    assert (model.predict(rfm) == rfm["labels_rfm_clustering"]).mean() == agreement
+
+
+def test_warm_start_reproduces_the_shipped_labels(rfm):
+    model = SegmentationModel(REFERENCE_FEATURES, n_clusters=3).fit(rfm, init_labels=rfm["labels_rfm_clustering"])
+    assert (model.predict(rfm) == rfm["labels_rfm_clustering"]).all()
+
+
+def test_save_and_load_predict_the_same(rfm, tmp_path):
+    model = SegmentationModel(n_clusters=3, n_init=2).fit(rfm)
+    loaded = SegmentationModel.load(model.save(str(tmp_path / "model.npz")))
+    assert (loaded.predict(rfm) == model.predict(rfm)).all()
+
+
+def test_segment_names_follow_the_cluster_profiles(rfm):
+    means = rfm.groupby("labels_rfm_clustering")[SEGMENT_FEATURES].mean().reset_index()
+    expected = {0: "Luxury Essentials Enthusiast", 1: "Premium Shopper & Leisure Seeker", 2: "Smart Essentials Spender"}
+    assert name_segments(means) == expected
+    # renumbering the clusters renumbers the names with them
+    means["labels_rfm_clustering"] = means["labels_rfm_clustering"].map({0: 2, 1: 0, 2: 1})
+    assert name_segments(means) == {2: expected[0], 0: expected[1], 1: expected[2]}
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from shared_cache import SharedCache
+
+
+def array(n_bytes):
+    return np.zeros(n_bytes, dtype=np.uint8)
+
+
+def test_least_recently_used_is_evicted_over_budget():
+    cache = SharedCache(budget_bytes=250)
+    cache.get("a", lambda: array(100))
+    cache.get("b", lambda: array(100))
+    cache.get("a", lambda: array(100))  # a is now the most recently used
+    cache.get("c", lambda: array(100))
+    assert cache.stats()["evictions"] == 1
+    assert cache.bytes == 200
+    loads = []
+    cache.get("a", lambda: loads.append("a") or array(100))
+    cache.get("b", lambda: loads.append("b") or array(100))
+    assert loads == ["b"]
+
+
+def test_entry_over_budget_is_kept_alone():
+    cache = SharedCache(budget_bytes=50)
+    cache.get("a", lambda: array(10))
+    value = cache.get("big", lambda: array(100))
+    assert cache.get("big", lambda: None) is value
+    assert cache.stats()["entries"] == 1
+
+
+def test_concurrent_sessions_load_once():
+    cache = SharedCache(budget_bytes=2**20)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.05)
+        return array(10)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("k", loader))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_failed_load_is_retried():
+    cache = SharedCache(budget_bytes=2**20)
+
+    def broken():
+        raise OSError("file went away")
+
+    with pytest.raises(OSError):
+        cache.get("k", broken)
+    assert cache._loading == {}
+    assert cache.get("k", lambda: 42) == 42
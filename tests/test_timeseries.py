@@ -0,0 +1,32 @@
+import pandas as pd
+
+from timeseries import monthly_from_totals, time_series
+
+
+def transactions(*dates):
+    return pd.DataFrame({'trans_datetime': pd.to_datetime(list(dates)), 'amt': 1.0})
+
+
+def test_week_across_new_year_is_labelled_by_transaction_year():
+    out = time_series(transactions('2021-01-01', '2021-01-05'), granularity='week')
+    assert set(out['year']) == {'2021'}
+    assert out['date'].iloc[0] == pd.Timestamp('2021-01-01')
+    assert out['trans_count'].sum() == 2
+
+
+def test_week_across_new_year_is_split_between_years():
+    out = time_series(transactions('2020-12-30', '2021-01-01'), granularity='week')
+    counts = out.groupby('year')['trans_count'].sum()
+    assert counts.to_dict() == {'2020': 1, '2021': 1}
+
+
+def test_month_calendar_is_complete():
+    out = time_series(transactions('2021-03-15'))
+    assert len(out) == 12
+    assert out.loc[out['month'] == 3, 'trans_count'].item() == 1
+
+
+def test_monthly_from_totals_matches_time_series():
+    df = transactions('2021-01-02', '2021-01-20', '2021-03-01')
+    totals = pd.DataFrame({'year': [2021, 2021], 'month': [1, 3], 'trans_count': [2, 1], 'total_amt': [2.0, 1.0]})
+    pd.testing.assert_frame_equal(monthly_from_totals(totals), time_series(df))
@@ -0,0 +1,72 @@
+"""Calendar time series of transaction count / sum / mean in a single groupby."""
+import pandas as pd
+
+# granularity name -> pandas period frequency
+FREQUENCIES = {"day": "D", "week": "W", "month": "M"}
+MONTH_MAP = {1: 'Jan', 2: 'Feb', 3: 'Mar', 4: 'Apr', 5: 'May', 6: 'Jun',
+             7: 'Jul', 8: 'Aug', 9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dec'}
+
+
+def time_series(df, years=None, granularity="month", date_col="trans_datetime", value_col="amt"):
+    """Transaction count, total and mean amount per period for the given years.
+
+    Every period of the requested years is present in the result, with a zero
+    count and total where there were no transactions. ``years`` defaults to all
+    years found in the data. A week that spans New Year is split in two rows,
+    one per year, each dated from its first day inside that year.
+    """
+    freq = FREQUENCIES[granularity]
+    dates = df[date_col]
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates)
+
+    year = dates.dt.year
+    if years is None:
+        years = year.dropna().unique()
+    years = sorted(int(y) for y in years)
+    if not years:
+        return pd.DataFrame(columns=['date', 'year', 'month', 'month_name', 'trans_count', 'total_amt', 'avg_amt'])
+
+    mask = year.isin(years)
+    periods = dates[mask].dt.to_period(freq)
+    stats = df.loc[mask, value_col].groupby([year[mask], periods]).agg(['size', 'sum', 'mean'])
+    return _calendar_frame(stats, years, freq)
+
+
+def monthly_from_totals(totals):
+    """Monthly series in the ``time_series`` layout from precomputed (year, month, trans_count, total_amt) totals."""
+    totals = totals.groupby(['year', 'month'], as_index=False)[['trans_count', 'total_amt']].sum()
+    years = sorted(int(y) for y in totals['year'].unique())
+    if not years:
+        return pd.DataFrame(columns=['date', 'year', 'month', 'month_name', 'trans_count', 'total_amt', 'avg_amt'])
+    periods = pd.PeriodIndex.from_fields(year=totals['year'], month=totals['month'], freq='M')
+    stats = pd.DataFrame({
+        'size': totals['trans_count'].to_numpy(),
+        'sum': totals['total_amt'].to_numpy(),
+        'mean': (totals['total_amt'] / totals['trans_count']).to_numpy(),
+    }, index=pd.MultiIndex.from_arrays([totals['year'].astype(int), periods]))
+    return _calendar_frame(stats, years, 'M')
+
+
+def _calendar_frame(stats, years, freq):
+    # stats is indexed by (year of the transactions, period); reindex over every period overlapping each
+    # requested year so empty periods show as 0, a week across New Year appears under both years
+    calendar = pd.MultiIndex.from_tuples(
+        [(y, p) for y in years for p in pd.period_range(f"{y}-01-01", f"{y}-12-31", freq=freq)])
+    stats = stats.reindex(calendar)
+    stats[['size', 'sum']] = stats[['size', 'sum']].fillna(0)
+
+    year = stats.index.get_level_values(0)
+    # the first day of the period inside its year
+    start = pd.DatetimeIndex(pd.PeriodIndex(stats.index.get_level_values(1)).start_time)
+    start = start.where(start.year == year, pd.to_datetime({'year': year, 'month': 1, 'day': 1}))
+    out = pd.DataFrame({
+        'date': start,
+        'year': year.astype(str),
+        'month': start.month,
+        'trans_count': stats['size'].astype(int).to_numpy(),
+        'total_amt': stats['sum'].astype(float).to_numpy(),
+        'avg_amt': stats['mean'].to_numpy(),
+    })
+    out['month_name'] = out['month'].map(MONTH_MAP)
+    return out
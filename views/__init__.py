@@ -0,0 +1,14 @@
+"""One module per sidebar entry, each with a ``render()`` function.
+
+app.py imports a page module only when its menu entry is selected, so heavy
+libraries and data are loaded on first use of a page that needs them.
+"""
+# menu entry -> module in this package
+PAGES = {
+    "Overall": "overall",
+    "Introduction": "introduction",
+    "Methodology": "methodology",
+    "Scope & Limitations": "scope",
+    "Results": "results",
+    "Proof of Concept": "proof_of_concept",
+}
@@ -0,0 +1,20 @@
+"""Methodology page."""
+import streamlit as st
+
+
+def render():
+    st.title("Methodology")
+    st.write("Describe the approach, techniques, and tools used.")
+
+    st.markdown("""
+    - **Step 1**: Preprocessing
+
+    - **Step 2**: Exploratory Data Analysis (EDA)
+
+    - **Step 3**: K Means Clustering
+
+    - **Step 4**: Cluster Analysis
+
+    - **Step 5**: Interpretation and Recommendations
+
+    """)
@@ -0,0 +1,19 @@
+"""Overall page."""
+import os
+
+import streamlit as st
+
+from media import image_dir, resized_image
+
+
+def render():
+    st.title("Overall Summary")
+    st.subheader('Adobo Bank is a bank diving into data driven decision making. We as their data scientist team will provide insights and recommendations based on Adobo Bank\'s data')
+    # open logo.png from image_dir
+    logo_path = os.path.join(image_dir, "logo.png")
+    if os.path.exists(logo_path):
+        # serve a downscaled copy (2x the display width for sharp hi-dpi rendering) instead of the full-size png
+        st.image(resized_image(logo_path, 1200), width = 600)
+    else:
+        st.warning("No image file found. Please add an image to `images/` directory.")
+    st.write("We aim to know who Adobo Bank's customers are, what the bank's current data quality is, how to improve data gathering and from their current set of data, how we can contribute to Adobo Bank's growth.")
@@ -0,0 +1,77 @@
+"""Proof of Concept page with the card recommendation form."""
+import streamlit as st
+
+
+def render():
+    st.title("Proof of Concept")
+    st.subheader("How can Adobo Bank effectively tailor its expanded credit card offerings to better serve its customers?")
+    st.write("Develop a system that efficiently provides personalized credit card recommendations to customers based on their financial profile, spending habits, and the bank’s customer segmentation framework.")
+    st.divider()
+    st.subheader("Personalized Credit Card Recommendation Model")
+    st.info("**Objective**  \nDevelop a system for personalized credit card recommendations based on customers' financial profiles & spending habits.")
+    st.info("**Approach**  \nUse regression analysis to match customers with the best credit card options.")
+    st.info("**Channels**  \nAdobo Bank App & Website: New and existing customers can enter their income and spending habits to receive personalized credit card recommendations instantly.")
+    st.info("**Benefits**  \nProvide clear credit card options upfront, minimizing consultation time and accelerating customer acquisition.")
+    st.divider()
+    st.subheader("Credit Card Recommendation System")
+    st.markdown("- **User Input**  \nCustomers enter income and spending habits via the app or website.")
+    st.markdown("- **Data Processing**  \nThe system processes customer data using regression model.")
+    st.markdown("- **Tailored Recommendation**  \nBest credit card options are suggested.")
+    st.markdown("- **Application Next Steps**  \nCustomers can apply immediately or request a callback.")
+    # try the recommendation on the cluster centroids from labels_rfm_clustering
+    with st.form("card_recommendation"):
+        st.write("Try it: enter your spending habits")
+        st.caption("Income is not in the transaction data the segments were built from, so this demo recommends from spending habits only.")
+        col1, col2 = st.columns(2)
+        transactions_per_month = col1.number_input("Transactions per month", min_value=0.0, value=20.0, step=1.0)
+        avg_spend = col2.number_input("Average spend per transaction", min_value=0.0, value=70.0, step=10.0)
+        tenure_days = col1.number_input("Days since first transaction", min_value=1, value=365, step=30)
+        recency_days = col2.number_input("Days since last transaction", min_value=0, value=30, step=1)
+        city_pop = st.number_input("Population of your city", min_value=0, value=100000, step=10000)
+        submitted = st.form_submit_button("Get my recommendation")
+    if submitted:
+        # numpy and the model are only needed once someone asks for a recommendation
+        from scoring import SEGMENT_FEATURES, get_recommender, profile_from_habits
+
+        recommender = get_recommender()
+        if recommender is None:
+            st.warning("No data file found. Please add a CSV file to `data/` directory.")
+        else:
+            profile = profile_from_habits(transactions_per_month, avg_spend, tenure_days, recency_days, city_pop)
+            result = recommender.recommend(**dict(zip(SEGMENT_FEATURES, profile[0])))
+            st.success(f"**{result['card']}**  \nYou look like a **{result['segment']}**.")
+    st.divider()
+    st.markdown(
+    "<h3 style='text-align: center;'>Machine Learning Classification Model for Personalized Credit Card Type Recommendations</h3>",
+    unsafe_allow_html=True
+    )
+    with st.expander("**Demographic Profile**"):
+      st.markdown("- Age")
+      st.markdown("- Age Group/Generation")
+      st.markdown("- Date of Birth")
+      st.markdown("- Home Address/Transaction Location")    
+    with st.expander("**Financial Profile**"):
+      st.markdown("- Occupation")
+      st.markdown("- Monthly Income")
+      st.markdown("- Assets")
+      st.markdown("- Liabilities")
+    with st.expander("**Spending Habits**"):
+      st.markdown("- Transaction Recency")
+      st.markdown("- Tenure & Frequency")
+      st.markdown("- Amount Spending")
+      st.markdown("- Transaction Categories")
+      st.markdown("- Customer Lifetime Value")
+    with st.expander("**Customer Segmentation**"):
+      st.markdown("- Identify best customer segment through regression model")
+    st.divider()
+    st.subheader("Methodology: Our Approach")
+    st.markdown("1. Data Collection and Preprocessing")
+    st.markdown("2. Statistical and Exploratory Data Analyses")
+    st.markdown("3. Model Training")
+    st.markdown("4. Model Evaluation and Hyperparameter Tuning")
+    st.markdown("5. Beta Testing and Deployment")
+    st.divider()
+    st.subheader("Personalized Credit Card Recommendation Model")
+    st.info("**Model Implementation**  \nThrough bank’s website and mobile apps for seamless customer access")
+    st.info("**Customer Feedback Collection**  \nTo better improve the bank’s products and services")
+    st.info("**Model Refinement and Updates**  \nUtilizing expanding customer transaction data")
@@ -0,0 +1,113 @@
+"""Results page, reads the precomputed aggregates, or the transaction index once a filter is set."""
+import pandas as pd
+import streamlit as st
+
+from aggregates import load_aggregates
+from charts import show_chart, year_range
+from profiling import section
+from query import POPULATION_BAND_LABELS, Filters, load_index
+from segmentation import SEGMENT_DESCRIPTIONS
+
+
+def _sidebar_filters(aggs):
+    st.sidebar.subheader("Filters")
+    first, last = aggs['date_range']
+    dates = st.sidebar.date_input("Transaction dates", value=(first, last), min_value=first, max_value=last)
+    generations = st.sidebar.multiselect("Generation", aggs['generation_counts']['generation'].tolist())
+    job_types = st.sidebar.multiselect("Job type", aggs['job_types'])
+    categories = st.sidebar.multiselect("Category group", aggs['category_counts']['category_group'].tolist())
+    names = aggs['segment_names']
+    clusters = st.sidebar.multiselect("Cluster label", aggs['cluster_means']['labels_rfm_clustering'].tolist(),
+                                      format_func=lambda label: f"{label}: {names.get(label, label)}")
+    bands = st.sidebar.multiselect("City population", POPULATION_BAND_LABELS)
+    # a half-picked date range (one date) keeps the full range until the second date is chosen
+    start, end = dates if len(dates) == 2 else (first, last)
+    return Filters(
+        start=start if start > first else None,
+        end=end if end < last else None,
+        generations=tuple(generations) or None,
+        job_types=tuple(job_types) or None,
+        categories=tuple(categories) or None,
+        clusters=tuple(clusters) or None,
+        population_bands=tuple(bands) or None,
+    )
+
+
+def render():
+    st.title("Results")
+    st.write("Findings and visualizations.")
+
+    with section("results.load_aggregates") as s:
+        aggs = load_aggregates()
+        s.rows = aggs['account_count'] if aggs else 0
+    if aggs is None:
+        st.warning("No data file found. Please add a CSV file to `data/` directory.")
+        return
+
+    # without filters the precomputed aggregates are shown as is, the transaction index is only loaded once a filter is set
+    filters = _sidebar_filters(aggs)
+    data_key = aggs['source_hash']
+    # named on all accounts, the cluster means of a filtered subset would not have the same profile
+    segment_names = aggs['segment_names']
+    if filters != Filters():
+        with section("results.filter") as s:
+            aggs = load_index(start=filters.start, end=filters.end).aggregate(filters)
+            s.rows = aggs['transaction_count']
+        data_key = f"{data_key}:{filters!r}"
+        st.info(f"Showing {aggs['account_count']} accounts and {aggs['transaction_count']:,} transactions matching the sidebar filters.")
+    # generation buckets ("Greatest": up to 1927, "Silent": 1928-1945, "Baby Boomer": 1946-1964, "Gen X": 1965-1981, ...) come from demographics.py
+    # charts are cached as Vega-Lite specs keyed on the aggregate data, see charts.py
+    # generate bar graph showing acct_num count by generation using alt
+    st.subheader("Demographic Profile of Adobo Bank Customers")
+    show_chart('generation', aggs, data_key)
+    st.write("Population Age Mean: ", aggs['age_stats']['mean'])
+    st.write("Population Age Min: ", aggs['age_stats']['min'])
+    st.write("Population Age Max: ", aggs['age_stats']['max'])
+    st.caption("Out of 88 unique customers, majority of Adobo Bank Customers belong in the Baby Boomer Generation (52 customers). ")
+    st.caption("All of Adobo Bank's customers are over 52 years old")
+    st.divider()
+    # create a horizontal bar graph of value_counts of category_group in df, sort highest to lowest
+    st.subheader("Customer Total Transaction Counts per Category")
+    show_chart('category_counts', aggs, data_key)
+    st.caption("Most transactions are in the shopping & micellaneous category followed by home & family tied with food & essentials")
+    st.divider()
+    # create a horizontal bar chart of sum of 'amt' per 'category_group' in df sorted highest to lowest using alt
+    st.subheader("Customer Total Transaction Amounts per Category")
+    show_chart('category_amounts', aggs, data_key)
+    st.caption("Most transactions are in the shopping & micellaneous category followed by food & essentials, then by home & family category")
+    st.divider()
+    # line chart of 'trans_num' count by month for every year in the data with Jan - Dec on the x-axis
+    st.subheader("Customer Transaction Count per Year")
+    show_chart('monthly_counts', aggs, data_key)
+    st.caption("December 2021 data is cut short at Dec 8 which could be the reason for the sudden drop")
+    st.caption("There is clear seasonality in spending behavior")
+    st.divider()
+    st.subheader(f"Total Amount Spent per Month ({year_range(aggs['monthly'])})")
+    show_chart('monthly_amounts', aggs, data_key)
+    st.caption("December 2021 data is cut short at Dec 8 which could be the reason for the sudden drop")
+    st.caption("There is clear seasonality in spending behavior")
+    st.divider()
+
+    # Create visualization for the k means clustering
+    st.subheader("Customer Segmentation")
+    st.write("We segmented our customers using the k means clustering algorithm")
+    st.caption("Only numerical features were used for clustering: all 14 numeric columns of the RFM table, i.e. recency, "
+               "frequency, total_amt, avg_spend, tenure, clv, city_pop and their recency_score, frequency_score, "
+               "monetary_score, rfm_score, rfm_level, population_group and tenure_score. The table below shows the "
+               "cluster means of the first seven.")
+    st.write(aggs['cluster_means'])
+    # Display in Streamlit with fixed width
+    st.subheader("K-Means Clustering: Mean Metrics by Cluster (Inverted Recency)")
+    show_chart('cluster_means', aggs, data_key, use_container_width=False)
+    st.caption("Recency was inverted for a more intuitive viewing of the data where higher values are better")
+    st.divider()
+    st.subheader("Cluster Analysis")
+    st.write("We labeled each cluster according to their spending habit")
+    # one row per cluster label, named by the profile of its cluster means (see segmentation.name_segments)
+    rfm_df_string = pd.DataFrame([{'Cluster Label': name, **SEGMENT_DESCRIPTIONS.get(name, {})}
+                                  for _, name in sorted(segment_names.items())], index=sorted(segment_names))
+    st.table(rfm_df_string)
+    st.subheader("Credit Card Expansion Recommendation")
+    st.info("**Smart Essentials Spender (Elite Rewards Card)**  \nFrequent spender on everyday necessities, values cashback and rewards for recurring purchases. Best suited for individuals who optimize spending for long-term savings and rewards.")
+    st.info("**Luxury Essentials Enthusiast (Gold Lifestyle Card)**  \nHigh-frequency spender who prioritizes premium experiences while maintaining practical spending habits. Prefers a mix of luxury and everyday purchases, benefiting from exclusive perks & travel rewards.")
+    st.info("**Premium Shopper & Leisure Seeker (Signature Luxe Card)**  \nSelective, high-value spender focused on luxury shopping, travel, and exclusive experiences. This customer prioritizes premium memberships, concierge services, and elite shopping benefits.")